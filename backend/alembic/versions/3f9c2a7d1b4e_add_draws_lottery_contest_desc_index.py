@@ -0,0 +1,48 @@
+"""add draws lottery/contest desc index
+
+Revision ID: 3f9c2a7d1b4e
+Revises: 
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b4e'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_draws_lottery_contest_desc'
+
+
+def _has_index() -> bool:
+    """Verifica se a tabela draws existe e já possui o índice."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('draws'):
+        return True  # Tabela será criada por create_all já com o índice
+    return any(ix['name'] == INDEX_NAME for ix in inspector.get_indexes('draws'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_index():
+        return
+    op.create_index(
+        INDEX_NAME,
+        'draws',
+        ['lottery_id', sa.text('contest_number DESC'), 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('draws') and any(
+        ix['name'] == INDEX_NAME for ix in inspector.get_indexes('draws')
+    ):
+        op.drop_index(INDEX_NAME, table_name='draws')
@@ -0,0 +1,82 @@
+"""add draws numbers mask
+
+Revision ID: 5a2f9e7b3c18
+Revises: e1a6b3c8d540
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2f9e7b3c18'
+down_revision: Union[str, Sequence[str], None] = 'e1a6b3c8d540'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Maior número representável no bitmask (BIGINT com sinal)
+NUMBERS_MASK_MAX = 63
+
+# Sorteios atualizados por lote no preenchimento
+BACKFILL_BATCH_SIZE = 1000
+
+draws = sa.table(
+    'draws',
+    sa.column('id', sa.Integer),
+    sa.column('numbers', sa.JSON().with_variant(postgresql.ARRAY(sa.SmallInteger), 'postgresql')),
+    sa.column('numbers_mask', sa.BigInteger),
+)
+
+
+def _to_mask(numbers):
+    """Bitmask dos números (bit n-1 = número n); None se algum não couber."""
+    mask = 0
+    for num in numbers:
+        if not 1 <= num <= NUMBERS_MASK_MAX:
+            return None
+        mask |= 1 << (num - 1)
+    return mask
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('draws'):
+        return  # Tabela será criada por create_all já com a coluna
+    if any(col['name'] == 'numbers_mask' for col in inspector.get_columns('draws')):
+        return
+    
+    op.add_column('draws', sa.Column(
+        'numbers_mask',
+        sa.BigInteger,
+        nullable=True,
+        comment='Bitmask dos números sorteados (bit n-1 = número n)',
+    ))
+    
+    # Preenche os sorteios existentes em lotes (executemany por lote)
+    update = (
+        sa.update(draws)
+        .where(draws.c.id == sa.bindparam('draw_id'))
+        .values(numbers_mask=sa.bindparam('mask'))
+    )
+    rows = bind.execute(sa.select(draws.c.id, draws.c.numbers)).all()
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        bind.execute(update, [
+            {'draw_id': draw_id, 'mask': _to_mask(numbers)}
+            for draw_id, numbers in rows[start:start + BACKFILL_BATCH_SIZE]
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('draws') and any(
+        col['name'] == 'numbers_mask' for col in inspector.get_columns('draws')
+    ):
+        with op.batch_alter_table('draws') as batch_op:
+            batch_op.drop_column('numbers_mask')
@@ -0,0 +1,48 @@
+"""timestamp server defaults
+
+Revision ID: 8b1e5d0c6a72
+Revises: 3f9c2a7d1b4e
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e5d0c6a72'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabelas que usam TimestampMixin
+TABLES = ('lotteries', 'draws', 'draw_features', 'users')
+COLUMNS = ('created_at', 'updated_at')
+
+
+def _alter_defaults(server_default) -> None:
+    """Aplica (ou remove) o DEFAULT das colunas de timestamp existentes."""
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue  # Tabela será criada por create_all já com o DEFAULT
+        with op.batch_alter_table(table) as batch_op:
+            for column in COLUMNS:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=False,
+                    server_default=server_default,
+                )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _alter_defaults(sa.func.now())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _alter_defaults(None)
@@ -0,0 +1,50 @@
+"""exact prize value and smallint feature counts
+
+Revision ID: 9d3c6f1a2e85
+Revises: 5a2f9e7b3c18
+Create Date: 2026-10-15 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3c6f1a2e85'
+down_revision: Union[str, Sequence[str], None] = '5a2f9e7b3c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Contagens/amplitudes de draw_features (valores pequenos)
+COUNT_COLUMNS = (
+    'spread_row', 'spread_col',
+    'count_top_half', 'count_bottom_half', 'count_left_half', 'count_right_half',
+    'count_border',
+    'quadrant_q1', 'quadrant_q2', 'quadrant_q3', 'quadrant_q4',
+)
+
+
+def _alter_types(prize_type, count_type) -> None:
+    """Altera o tipo de draws.prize_value e das contagens de draw_features."""
+    inspector = sa.inspect(op.get_bind())
+    
+    if inspector.has_table('draws'):
+        with op.batch_alter_table('draws') as batch_op:
+            batch_op.alter_column('prize_value', type_=prize_type, existing_nullable=True)
+    
+    if inspector.has_table('draw_features'):
+        with op.batch_alter_table('draw_features') as batch_op:
+            for column in COUNT_COLUMNS:
+                batch_op.alter_column(column, type_=count_type, existing_nullable=True)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _alter_types(sa.Numeric(15, 2), sa.SmallInteger())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _alter_types(sa.Float(), sa.Integer())
@@ -0,0 +1,57 @@
+"""cover last draw with index include
+
+Revision ID: c4d7e2a9f013
+Revises: 8b1e5d0c6a72
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e2a9f013'
+down_revision: Union[str, Sequence[str], None] = '8b1e5d0c6a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_draws_lottery_contest_desc'
+INCLUDE_COLUMNS = ['draw_date', 'numbers']
+
+# Dialetos com suporte a INCLUDE em índices
+INCLUDE_DIALECTS = ('postgresql', 'mssql')
+
+
+def _recreate_index(include: bool) -> None:
+    """Recria o índice com (ou sem) as colunas INCLUDE."""
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    if dialect not in INCLUDE_DIALECTS:
+        return  # Ex.: SQLite, sem INCLUDE; o índice existente é mantido
+    
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('draws'):
+        return  # Tabela será criada por create_all já com o índice
+    
+    if any(ix['name'] == INDEX_NAME for ix in inspector.get_indexes('draws')):
+        op.drop_index(INDEX_NAME, table_name='draws')
+    
+    kwargs = {f'{dialect}_include': INCLUDE_COLUMNS} if include else {}
+    op.create_index(
+        INDEX_NAME,
+        'draws',
+        ['lottery_id', sa.text('contest_number DESC'), 'id'],
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_index(include=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_index(include=False)
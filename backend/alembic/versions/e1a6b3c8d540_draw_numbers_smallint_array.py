@@ -0,0 +1,72 @@
+"""draw numbers smallint array
+
+Revision ID: e1a6b3c8d540
+Revises: c4d7e2a9f013
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a6b3c8d540'
+down_revision: Union[str, Sequence[str], None] = 'c4d7e2a9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_draws_lottery_contest_desc'
+
+# Expressão que converte o valor atual de numbers para o novo tipo
+TO_ARRAY = 'ARRAY(SELECT json_array_elements_text(numbers)::smallint)'
+TO_JSON = 'to_json(numbers)'
+
+
+def _convert_numbers(new_type, expression: str) -> None:
+    """
+    Troca o tipo de draws.numbers (só PostgreSQL).
+    
+    USING não aceita subconsulta, então a conversão usa uma coluna
+    temporária. O índice que inclui numbers é recriado ao final.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return  # Demais bancos continuam com JSON
+    
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('draws'):
+        return  # Tabela será criada por create_all já com o tipo novo
+    
+    if any(ix['name'] == INDEX_NAME for ix in inspector.get_indexes('draws')):
+        op.drop_index(INDEX_NAME, table_name='draws')
+    
+    op.add_column('draws', sa.Column('numbers_new', new_type, nullable=True))
+    op.execute(f'UPDATE draws SET numbers_new = {expression}')
+    op.drop_column('draws', 'numbers')
+    op.alter_column(
+        'draws',
+        'numbers_new',
+        new_column_name='numbers',
+        nullable=False,
+        comment='Números sorteados [1, 5, 12, ...]',
+    )
+    
+    op.create_index(
+        INDEX_NAME,
+        'draws',
+        ['lottery_id', sa.text('contest_number DESC'), 'id'],
+        postgresql_include=['draw_date', 'numbers'],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert_numbers(postgresql.ARRAY(sa.SmallInteger), TO_ARRAY)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert_numbers(sa.JSON, TO_JSON)
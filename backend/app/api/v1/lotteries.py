@@ -4,11 +4,13 @@ Endpoints de loterias.
 Operações CRUD e consultas de loterias.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Iterator, List, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_db, SessionLocal
 from app.models.lottery import Lottery, Draw
 from app.schemas.lottery import (
     LotteryResponse,
@@ -18,7 +20,31 @@ from app.schemas.lottery import (
 from app.services.lottery_service import LotteryService
 from app.services.draw_service import DrawService
 
-router = APIRouter()
+# orjson (C) serializa listas grandes de sorteios bem mais rápido que o json padrão
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+def get_lottery_or_404(
+    slug: str,
+    db: Session = Depends(get_db)
+) -> Lottery:
+    """
+    Dependency que resolve a loteria do path ou responde 404.
+    
+    Args:
+        slug: Identificador da loteria
+        db: Sessão do banco de dados
+    
+    Returns:
+        Loteria encontrada
+    
+    Raises:
+        404: Loteria não encontrada
+    """
+    lottery = LotteryService.get_by_slug(db, slug)
+    if not lottery:
+        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
+    return lottery
 
 
 @router.get("", response_model=List[LotteryResponse])
@@ -42,44 +68,51 @@ def list_lotteries(
 
 @router.get("/{slug}", response_model=LotteryResponse)
 def get_lottery(
-    slug: str,
-    db: Session = Depends(get_db)
+    lottery: Lottery = Depends(get_lottery_or_404)
 ):
     """
     Detalhes de uma loteria específica.
     
     Args:
-        slug: Identificador da loteria (megasena, lotofacil, etc.)
-        db: Sessão do banco de dados
-        
+        lottery: Loteria resolvida a partir do slug (megasena, lotofacil, etc.)
+    
     Returns:
         Dados da loteria
         
     Raises:
         404: Loteria não encontrada
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
-        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
     return lottery
 
 
 @router.get("/{slug}/draws", response_model=List[DrawResponse])
 def list_draws(
-    slug: str,
-    skip: int = Query(0, ge=0, description="Quantidade de registros a pular"),
+    response: Response,
+    lottery: Lottery = Depends(get_lottery_or_404),
+    skip: int = Query(
+        0,
+        ge=0,
+        description="Quantidade de registros a pular (obsoleto: prefira cursor)",
+        deprecated=True,
+    ),
     limit: int = Query(100, ge=1, le=500, description="Máximo de registros"),
     order_desc: bool = Query(True, description="Ordenar por concurso decrescente"),
+    cursor: Optional[int] = Query(None, ge=0, description="Último concurso recebido (paginação por cursor)"),
     db: Session = Depends(get_db)
 ):
     """
     Lista histórico de sorteios de uma loteria (paginado).
     
+    O cabeçalho `X-Next-Cursor` traz o valor de `cursor` para a próxima
+    página (ausente quando não há mais registros).
+    
     Args:
-        slug: Identificador da loteria
-        skip: Quantos registros pular (paginação)
+        response: Resposta HTTP (para o cabeçalho X-Next-Cursor)
+        lottery: Loteria resolvida a partir do slug
+        skip: Quantos registros pular (paginação por offset, obsoleto)
         limit: Máximo de registros a retornar
         order_desc: Ordenar por número do concurso decrescente
+        cursor: Último concurso da página anterior
         db: Sessão do banco de dados
         
     Returns:
@@ -88,33 +121,76 @@ def list_draws(
     Raises:
         404: Loteria não encontrada
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
-        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
-    
     draws = DrawService.get_by_lottery(
         db,
         lottery_id=lottery.id,
         skip=skip,
         limit=limit,
-        order_desc=order_desc
+        order_desc=order_desc,
+        cursor=cursor
     )
     
+    if len(draws) == limit:
+        response.headers["X-Next-Cursor"] = str(draws[-1].contest_number)
+    
     return draws
 
 
+# Sorteios por bloco enviado no export (uma ida ao banco por bloco)
+EXPORT_BATCH_SIZE = 1000
+
+
+@router.get("/{slug}/draws/export")
+def export_draws(
+    lottery: Lottery = Depends(get_lottery_or_404)
+):
+    """
+    Exporta o histórico completo de sorteios em NDJSON (um JSON por linha).
+    
+    As linhas são lidas com cursor no servidor e enviadas em blocos, sem
+    montar a lista inteira em memória. O streaming usa sessão própria,
+    pois a de get_db é fechada antes do envio da resposta.
+    
+    Args:
+        lottery: Loteria resolvida a partir do slug
+    
+    Returns:
+        StreamingResponse application/x-ndjson
+    
+    Raises:
+        404: Loteria não encontrada
+    """
+    lottery_id = lottery.id
+    
+    def iter_ndjson() -> Iterator[bytes]:
+        session = SessionLocal()
+        try:
+            chunk = []
+            for row in DrawService.iter_by_lottery(session, lottery_id, EXPORT_BATCH_SIZE):
+                chunk.append(orjson.dumps(row._asdict()))
+                if len(chunk) == EXPORT_BATCH_SIZE:
+                    yield b"\n".join(chunk) + b"\n"
+                    chunk = []
+            if chunk:
+                yield b"\n".join(chunk) + b"\n"
+        finally:
+            session.close()
+    
+    return StreamingResponse(iter_ndjson(), media_type="application/x-ndjson")
+
+
 @router.get("/{slug}/draws/{contest_number}", response_model=DrawWithFeaturesResponse)
 def get_draw(
-    slug: str,
     contest_number: int,
+    lottery: Lottery = Depends(get_lottery_or_404),
     db: Session = Depends(get_db)
 ):
     """
     Detalhes de um sorteio específico (com features espaciais).
     
     Args:
-        slug: Identificador da loteria
         contest_number: Número do concurso
+        lottery: Loteria resolvida a partir do slug
         db: Sessão do banco de dados
         
     Returns:
@@ -123,23 +199,20 @@ def get_draw(
     Raises:
         404: Loteria ou sorteio não encontrado
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
-        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
-    
-    draw = DrawService.get_by_contest(db, lottery.id, contest_number)
+    draw = DrawService.get_by_contest(db, lottery.id, contest_number, with_features=True)
     if not draw:
         raise HTTPException(
             status_code=404,
-            detail=f"Contest {contest_number} not found for lottery '{slug}'"
+            detail=f"Contest {contest_number} not found for lottery '{lottery.slug}'"
         )
     
-    return draw
+    # Sorteio importado sem features (amostragem): calcula agora
+    return DrawService.ensure_features(db, draw)
 
 
 @router.get("/{slug}/stats")
 def get_stats(
-    slug: str,
+    lottery: Lottery = Depends(get_lottery_or_404),
     db: Session = Depends(get_db)
 ):
     """
@@ -152,7 +225,7 @@ def get_stats(
     - Números do último sorteio
     
     Args:
-        slug: Identificador da loteria
+        lottery: Loteria resolvida a partir do slug
         db: Sessão do banco de dados
         
     Returns:
@@ -161,17 +234,13 @@ def get_stats(
     Raises:
         404: Loteria não encontrada
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
-        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
-    
-    stats = LotteryService.get_stats(db, slug)
+    stats = LotteryService.get_stats_for_lottery(db, lottery)
     return stats
 
 
 @router.get("/{slug}/frequency")
 def get_frequency(
-    slug: str,
+    lottery: Lottery = Depends(get_lottery_or_404),
     db: Session = Depends(get_db)
 ):
     """
@@ -181,7 +250,7 @@ def get_frequency(
     ordenado do mais frequente para o menos frequente.
     
     Args:
-        slug: Identificador da loteria
+        lottery: Loteria resolvida a partir do slug
         db: Sessão do banco de dados
         
     Returns:
@@ -190,11 +259,7 @@ def get_frequency(
     Raises:
         404: Loteria não encontrada
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
-        raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
-    
-    frequency = LotteryService.get_frequency(db, slug)
+    frequency = LotteryService.get_frequency(db, lottery.slug)
     return frequency
 
 
@@ -209,6 +274,9 @@ def get_analysis(
     Combina estatísticas gerais, frequência de números e
     informações sobre o último sorteio.
     
+    Não usa get_lottery_or_404: com a análise em cache a resposta sai
+    sem nenhuma consulta, e o 404 vem do próprio resultado vazio.
+    
     Args:
         slug: Identificador da loteria
         db: Sessão do banco de dados
@@ -219,20 +287,8 @@ def get_analysis(
     Raises:
         404: Loteria não encontrada
     """
-    lottery = LotteryService.get_by_slug(db, slug)
-    if not lottery:
+    analysis = LotteryService.get_analysis_bundle(db, slug)
+    if not analysis:
         raise HTTPException(status_code=404, detail=f"Lottery '{slug}' not found")
     
-    stats = LotteryService.get_stats(db, slug)
-    frequency = LotteryService.get_frequency(db, slug)
-    
-    return {
-        "lottery": stats["lottery"],
-        "statistics": {
-            "total_draws": stats["total_draws"],
-            "last_contest": stats["last_contest"],
-            "last_draw_date": stats["last_draw_date"],
-            "last_numbers": stats["last_numbers"],
-        },
-        "frequency": frequency["frequency"][:10],  # Top 10 mais frequentes
-    }
+    return analysis
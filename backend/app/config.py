@@ -9,7 +9,10 @@ Suporta múltiplos tipos de banco de dados:
 
 from pydantic_settings import BaseSettings
 from typing import Literal
-from functools import lru_cache
+from dataclasses import dataclass, fields
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class Settings(BaseSettings):
@@ -51,6 +54,38 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeSettings:
+    """
+    Configurações congeladas usadas em tempo de execução.
+    
+    Settings (Pydantic) é construído e validado uma única vez; os valores
+    são copiados para esta dataclass imutável, cuja leitura de atributos
+    é um acesso direto a slot, sem a camada de validação do Pydantic.
+    """
+    
+    ENVIRONMENT: str
+    DATABASE_TYPE: str
+    DATABASE_URL: str
+    SUPABASE_URL: str | None
+    SUPABASE_KEY: str | None
+    SECRET_KEY: str
+    ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int
+    CORS_ORIGINS: str
+    API_V1_PREFIX: str
+    PROJECT_NAME: str
+    REDIS_URL: str | None
+    CELERY_BROKER_URL: str | None
+    CELERY_RESULT_BACKEND: str | None
+    LOG_LEVEL: str
+    
+    @classmethod
+    def from_settings(cls, source: Settings) -> "RuntimeSettings":
+        """Cria a versão congelada a partir das configurações validadas."""
+        return cls(**{f.name: getattr(source, f.name) for f in fields(cls)})
     
     @property
     def environment(self) -> str:
@@ -86,18 +121,16 @@ class Settings(BaseSettings):
             return "postgresql"
 
 
-@lru_cache()
-def get_settings() -> Settings:
+def get_settings() -> RuntimeSettings:
     """
-    Retorna instância singleton das configurações.
+    Retorna as configurações da aplicação.
     
-    @lru_cache garante que Settings() seja chamado apenas uma vez.
+    Mantido para injeção de dependência; devolve a instância única
+    criada na importação do módulo.
     """
-    settings = Settings()
-    print(f"[DEBUG] Loaded DATABASE_URL: {settings.DATABASE_URL}")
-    print(f"[DEBUG] Database type: {settings.DATABASE_TYPE}")
     return settings
 
 
-# Instância global
-settings = get_settings()
+# Instância global, construída uma única vez na importação
+settings = RuntimeSettings.from_settings(Settings())
+logger.debug(f"Database type: {settings.DATABASE_TYPE}")
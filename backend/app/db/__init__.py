@@ -9,13 +9,16 @@ Suporta:
 Usa SQLAlchemy 2.0 com suporte a múltiplos dialectos.
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool, QueuePool
-from typing import Generator
+from typing import Generator, Optional
 import logging
 
+import redis
+
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,7 @@ def get_engine_kwargs() -> dict:
     Retorna kwargs específicos para cada tipo de banco.
     
     Otimizações por dialeto:
-    - PostgreSQL/Supabase: Pool de conexões otimizado
+    - PostgreSQL/Supabase: Pool de conexões otimizado e executemany em lote
     - MS SQL Server: Configurações específicas para ODBC
     """
     base_kwargs = {
@@ -78,6 +81,15 @@ def get_engine_kwargs() -> dict:
                 "poolclass": NullPool,
             })
         
+        # psycopg2: INSERTs em lote via insertmanyvalues (VALUES de várias
+        # linhas) e UPDATE/DELETE com executemany via execute_batch
+        if make_url(settings.DATABASE_URL).get_driver_name() == "psycopg2":
+            base_kwargs.update({
+                "executemany_mode": "values_plus_batch",
+                "insertmanyvalues_page_size": 1000,
+                "executemany_batch_page_size": 500,
+            })
+        
         # Supabase: Adiciona parâmetros específicos
         if settings.DATABASE_TYPE == "supabase":
             base_kwargs["connect_args"] = {
@@ -88,6 +100,19 @@ def get_engine_kwargs() -> dict:
     return base_kwargs
 
 
+def get_pool_capacity() -> Optional[int]:
+    """
+    Retorna o máximo de conexões simultâneas do pool (pool_size + max_overflow).
+    
+    Returns:
+        Capacidade do pool ou None quando não há limite (ex: NullPool)
+    """
+    kwargs = get_engine_kwargs()
+    if "pool_size" not in kwargs:
+        return None
+    return kwargs["pool_size"] + kwargs.get("max_overflow", 0)
+
+
 # Engine global
 engine = create_engine(
     settings.DATABASE_URL,
@@ -103,6 +128,24 @@ SessionLocal = sessionmaker(
 )
 
 
+# Cliente Redis global (opcional - None quando REDIS_URL não está configurado)
+redis_client: Optional[redis.Redis] = (
+    redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    if settings.REDIS_URL
+    else None
+)
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Dependency para obter o cliente Redis compartilhado.
+    
+    Returns:
+        Cliente Redis (com pool de conexões) ou None se o cache está desabilitado
+    """
+    return redis_client
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency para obter sessão do banco.
@@ -150,16 +193,17 @@ def check_db_connection() -> bool:
     """
     Verifica se a conexão com o banco está ativa.
     
+    Abre uma conexão e a devolve em seguida: com pool, o pool_pre_ping
+    já testa (e repõe, se caída) a conexão no checkout; sem pool (NullPool),
+    abrir a conexão é a própria verificação.
+    
     Returns:
         bool: True se conectado, False caso contrário
     """
     try:
-        with engine.connect() as conn:
-            if settings.DATABASE_TYPE == "mssql":
-                conn.execute("SELECT 1")
-            else:  # postgresql/supabase
-                conn.execute("SELECT 1")
-        logger.info(f"✓ Conectado ao banco: {settings.DATABASE_TYPE}")
+        with engine.connect():
+            pass
+        logger.debug(f"✓ Conectado ao banco: {settings.DATABASE_TYPE}")
         return True
     except Exception as e:
         logger.error(f"✗ Erro de conexão: {e}")
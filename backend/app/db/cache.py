@@ -0,0 +1,163 @@
+"""
+Cache Redis para consultas frequentes.
+
+Todas as operações toleram falhas: se o Redis não estiver configurado
+ou estiver indisponível, a chamada segue normalmente para o banco.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import redis
+
+from app.db import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def cache_get(key: str) -> Optional[Any]:
+    """
+    Busca valor (JSON) no cache.
+    
+    Args:
+        key: Chave do cache
+    
+    Returns:
+        Valor decodificado ou None se ausente/indisponível
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    
+    try:
+        raw = client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Falha ao ler cache '{key}': {e}")
+        return None
+    
+    return json.loads(raw) if raw is not None else None
+
+
+def cache_set(key: str, value: Any, ttl: int) -> None:
+    """
+    Grava valor (serializável em JSON) no cache.
+    
+    Args:
+        key: Chave do cache
+        value: Valor a armazenar
+        ttl: Tempo de expiração em segundos
+    """
+    client = get_redis()
+    if client is None:
+        return
+    
+    try:
+        client.setex(key, ttl, json.dumps(value))
+    except redis.RedisError as e:
+        logger.warning(f"Falha ao gravar cache '{key}': {e}")
+
+
+def cache_delete(*keys: str) -> None:
+    """
+    Remove chaves do cache (invalidação).
+    
+    Args:
+        keys: Chaves a remover
+    """
+    client = get_redis()
+    if client is None or not keys:
+        return
+    
+    try:
+        client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Falha ao invalidar cache {keys}: {e}")
+
+
+def redis_cached(
+    key_fn: Callable[..., str],
+    ttl: int,
+    dump: Optional[Callable[[Any], Any]] = None,
+    load: Optional[Callable[[Any], Any]] = None,
+) -> Callable:
+    """
+    Decorator que guarda o resultado da função no Redis.
+    
+    Resultados vazios (None, {}) não são armazenados, para que registros
+    criados depois sejam encontrados sem esperar o TTL.
+    
+    Args:
+        key_fn: Recebe os mesmos argumentos da função e retorna a chave
+        ttl: Tempo de expiração em segundos
+        dump: Converte o resultado para algo serializável em JSON
+        load: Reconstrói o resultado a partir do valor em cache
+    
+    Example:
+        >>> @redis_cached(key_fn=lambda db, slug: f"freq:{slug}", ttl=86400)
+        ... def get_frequency(db, slug): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_fn(*args, **kwargs)
+            
+            cached = cache_get(key)
+            if cached is not None:
+                return load(cached) if load else cached
+            
+            result = func(*args, **kwargs)
+            if result:
+                cache_set(key, dump(result) if dump else result, ttl)
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+
+def model_to_dict(obj: Any) -> dict:
+    """
+    Serializa as colunas de um model SQLAlchemy para JSON.
+    
+    Args:
+        obj: Instância do model
+    
+    Returns:
+        Dicionário coluna → valor (datas em ISO 8601)
+    """
+    data = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def model_from_dict(model_cls: type, data: dict) -> Any:
+    """
+    Reconstrói um model (transiente) a partir de model_to_dict.
+    
+    Args:
+        model_cls: Classe do model
+        data: Dicionário gerado por model_to_dict
+    
+    Returns:
+        Instância do model, fora da sessão
+    """
+    values = dict(data)
+    for column in model_cls.__table__.columns:
+        value = values.get(column.key)
+        if isinstance(value, str):
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                continue
+            if python_type is datetime:
+                values[column.key] = datetime.fromisoformat(value)
+            elif python_type is date:
+                values[column.key] = date.fromisoformat(value)
+    return model_cls(**values)
@@ -5,6 +5,7 @@ Centraliza todas as implementações de loterias.
 """
 
 from app.lotteries.base import LotteryBase
+from app.lotteries.features import DrawFeatures, FEATURE_NAMES
 from app.lotteries.megasena import megasena
 from app.lotteries.lotofacil import lotofacil
 
@@ -71,4 +72,4 @@ def list_lotteries() -> list[dict]:
     ]
 
 
-__all__ = ["LotteryBase", "megasena", "lotofacil", "LOTTERIES", "get_lottery", "list_lotteries"]
+__all__ = ["LotteryBase", "DrawFeatures", "FEATURE_NAMES", "megasena", "lotofacil", "LOTTERIES", "get_lottery", "list_lotteries"]
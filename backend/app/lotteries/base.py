@@ -6,77 +6,71 @@ Permite adicionar novas loterias facilmente mantendo consistência.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict
+from functools import cached_property
+from typing import List, Tuple, Dict, FrozenSet
 import numpy as np
 
+from app.lotteries.features import DrawFeatures
+
 
 class LotteryBase(ABC):
     """
     Classe base abstrata para todas as loterias.
     
     Cada loteria (Mega-Sena, Lotofácil, etc.) deve herdar desta classe
-    e implementar os métodos abstratos.
+    e definir os atributos de configuração e implementar os métodos abstratos.
     """
     
-    def __init__(self):
-        """Inicializa a loteria."""
-        self._validate_configuration()
+    # Deslocamentos (dr, dc) para vizinhança 4 e 8-conectada
+    _DIRECTIONS_4 = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    _DIRECTIONS_8 = (
+        (-1, -1), (-1, 0), (-1, 1),
+        (0, -1),           (0, 1),
+        (1, -1),  (1, 0),  (1, 1)
+    )
     
-    @property
-    @abstractmethod
-    def slug(self) -> str:
-        """
-        Identificador único da loteria (URL-friendly).
-        
-        Exemplos: 'megasena', 'lotofacil', 'quina'
-        """
-        pass
+    # Configuração da loteria: cada subclasse define como atributos de classe
+    # (constantes simples, sem o custo de descriptor de uma @property)
+    slug: str             # Identificador URL-friendly (ex: 'megasena', 'lotofacil')
+    name: str             # Nome completo (ex: 'Mega-Sena', 'Lotofácil')
+    grid_rows: int        # Número de linhas do volante
+    grid_cols: int        # Número de colunas do volante
+    total_numbers: int    # Total de números disponíveis (ex: 60 para Mega-Sena)
+    draw_size: int        # Quantos números são sorteados (ex: 6 para Mega-Sena)
+    min_number: int       # Menor número possível (geralmente 1)
+    max_number: int       # Maior número possível (ex: 60 para Mega-Sena)
     
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """
-        Nome completo da loteria.
-        
-        Exemplos: 'Mega-Sena', 'Lotofácil', 'Quina'
-        """
-        pass
+    _CONFIG_ATTRIBUTES = (
+        'slug', 'name', 'grid_rows', 'grid_cols',
+        'total_numbers', 'draw_size', 'min_number', 'max_number'
+    )
     
-    @property
-    @abstractmethod
-    def grid_rows(self) -> int:
-        """Número de linhas do volante."""
-        pass
+    # Derivados do volante, calculados em __init_subclass__
+    half_rows: float      # Metade das linhas (limite superior/inferior)
+    half_cols: float      # Metade das colunas (limite esquerda/direita)
+    center_row: float     # Linha do centro geométrico do volante
+    center_col: float     # Coluna do centro geométrico do volante
     
-    @property
-    @abstractmethod
-    def grid_cols(self) -> int:
-        """Número de colunas do volante."""
-        pass
+    # Índices fixos pelo draw_size, calculados em __init_subclass__
+    _pair_index: Tuple[np.ndarray, np.ndarray]  # Pares (i < j) do triângulo superior
+    _diagonal: np.ndarray                       # 0..draw_size-1
     
-    @property
-    @abstractmethod
-    def total_numbers(self) -> int:
-        """Total de números disponíveis (ex: 60 para Mega-Sena)."""
-        pass
+    def __init_subclass__(cls, **kwargs):
+        """Calcula as constantes derivadas do volante uma vez por classe."""
+        super().__init_subclass__(**kwargs)
+        if hasattr(cls, 'grid_rows') and hasattr(cls, 'grid_cols'):
+            cls.half_rows = cls.grid_rows / 2
+            cls.half_cols = cls.grid_cols / 2
+            cls.center_row = cls.half_rows - 0.5
+            cls.center_col = cls.half_cols - 0.5
+        if hasattr(cls, 'draw_size'):
+            cls._pair_index = np.triu_indices(cls.draw_size, k=1)
+            cls._diagonal = np.arange(cls.draw_size)
     
-    @property
-    @abstractmethod
-    def draw_size(self) -> int:
-        """Quantos números são sorteados (ex: 6 para Mega-Sena)."""
-        pass
-    
-    @property
-    @abstractmethod
-    def min_number(self) -> int:
-        """Menor número possível (geralmente 1)."""
-        pass
-    
-    @property
-    @abstractmethod
-    def max_number(self) -> int:
-        """Maior número possível (ex: 60 para Mega-Sena)."""
-        pass
+    def __init__(self):
+        """Inicializa a loteria."""
+        self._validate_configuration()
+        self._build_grid_tables()
     
     # =========================================================================
     # Métodos Abstratos - Cada loteria deve implementar
@@ -145,6 +139,228 @@ class LotteryBase(ABC):
         
         return True
     
+    def validate_numbers_batch(self, draws: np.ndarray) -> np.ndarray:
+        """
+        Valida vários sorteios de uma vez (versão vetorizada de validate_numbers).
+        
+        Args:
+            draws: Array 2D (n_sorteios, draw_size) com os números de cada sorteio
+        
+        Returns:
+            Array booleano (n_sorteios,) com True para os sorteios válidos
+        """
+        arr = np.asarray(draws)
+        
+        if arr.ndim != 2 or arr.shape[1] != self.draw_size:
+            return np.zeros(arr.shape[0] if arr.ndim else 0, dtype=bool)
+        
+        in_range = ((arr >= self.min_number) & (arr <= self.max_number)).all(axis=1)
+        
+        # Após ordenar cada linha, duplicados aparecem como diferença zero
+        sorted_arr = np.sort(arr, axis=1)
+        unique = (np.diff(sorted_arr, axis=1) > 0).all(axis=1)
+        
+        return in_range & unique
+    
+    def calculate_features(self, numbers: List[int]) -> DrawFeatures:
+        """
+        Calcula features espaciais e estatísticas dos números sorteados.
+        
+        Usa apenas a geometria do volante (tabelas pré-calculadas), então
+        serve para qualquer loteria; subclasses podem sobrescrever.
+        
+        Args:
+            numbers: Lista de números sorteados
+        
+        Returns:
+            DrawFeatures (campos mapeados para colunas do modelo DrawFeature)
+        """
+        if not self.validate_numbers(numbers):
+            raise ValueError(f"Números inválidos: {numbers}")
+        
+        # Converte números para posições (já validados: índices no intervalo)
+        idx = np.asarray(numbers) - self.min_number
+        rows = self.row_of[idx]
+        cols = self.col_of[idx]
+        mean_row = float(rows.mean())
+        mean_col = float(cols.mean())
+        
+        # Distâncias entre todos os pares por broadcasting (matriz n×n);
+        # para 6-15 pontos é mais barato que o despacho de scipy.pdist
+        coords = self.coords_of[idx]
+        diff = coords[:, None, :] - coords[None, :, :]
+        sq = np.einsum('ijk,ijk->ij', diff, diff)
+        distances = np.sqrt(sq[self._pair_index])
+        
+        if len(distances) > 0:
+            mean_distance = float(np.mean(distances))
+            std_distance = float(np.std(distances))
+            min_distance = float(np.min(distances))
+            max_distance = float(np.max(distances))
+        else:
+            mean_distance = std_distance = min_distance = max_distance = 0.0
+        
+        # Metades do volante via tabelas pré-calculadas por número
+        count_top = int(self.top_half_mask[idx].sum())
+        count_left = int(self.left_half_mask[idx].sum())
+        
+        quadrant_counts = np.bincount(self.quadrant_id[idx], minlength=4)
+        
+        if len(coords) > 1:
+            sq[self._diagonal, self._diagonal] = np.inf
+            mean_nearest_neighbor = float(np.sqrt(sq.min(axis=1)).mean())
+        else:
+            mean_nearest_neighbor = 0.0
+        
+        return DrawFeatures(
+            # Distâncias
+            mean_distance=mean_distance,
+            std_distance=std_distance,
+            min_distance=min_distance,
+            max_distance=max_distance,
+            
+            # Posições
+            mean_row=mean_row,
+            std_row=float(rows.std()),
+            mean_col=mean_col,
+            std_col=float(cols.std()),
+            spread_row=int(rows.max() - rows.min()),
+            spread_col=int(cols.max() - cols.min()),
+            
+            # Distribuição espacial
+            count_top_half=count_top,
+            count_bottom_half=len(numbers) - count_top,
+            count_left_half=count_left,
+            count_right_half=len(numbers) - count_left,
+            count_border=int(self.border_mask[idx].sum()),
+            
+            # Features avançadas (simplificadas por ora, podem ser melhoradas depois)
+            spatial_autocorr=0.0,  # TODO: Implementar I de Moran
+            cluster_coefficient=0.0,  # TODO: Implementar clustering
+            mean_nearest_neighbor=mean_nearest_neighbor,
+            convex_hull_area=0.0,  # TODO: Implementar convex hull
+            centroid_distance=float(np.sqrt((mean_row - self.center_row)**2 + (mean_col - self.center_col)**2)),
+            quadrant_q1=int(quadrant_counts[0]),
+            quadrant_q2=int(quadrant_counts[1]),
+            quadrant_q3=int(quadrant_counts[2]),
+            quadrant_q4=int(quadrant_counts[3]),
+            entropy_spatial=0.0,  # TODO: Implementar entropia
+            dispersion_index=std_distance / mean_distance if mean_distance > 0 else 0.0,
+            pattern_regularity=0.0,  # TODO: Implementar regularidade
+        )
+    
+    def calculate_features_batch(self, draws: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calcula as features de vários sorteios de uma vez (versão vetorizada
+        de calculate_features).
+        
+        Todas as operações são feitas sobre arrays (n_sorteios, draw_size),
+        sem laço Python por sorteio. Os valores são os mesmos de
+        calculate_features, sorteio a sorteio.
+        
+        Args:
+            draws: Array 2D (n_sorteios, draw_size) com os números de cada sorteio
+        
+        Returns:
+            Dict coluna -> array (n_sorteios,), com os mesmos campos de
+            DrawFeatures (mapeados para colunas do modelo DrawFeature)
+        
+        Raises:
+            ValueError: Se algum sorteio for inválido
+        """
+        nums = np.asarray(draws)
+        if nums.ndim != 2 or not self.validate_numbers_batch(nums).all():
+            raise ValueError("Sorteios inválidos no lote")
+        
+        n_draws, size = nums.shape
+        idx = nums - self.min_number
+        coords = self.coords_of[idx]
+        rows = coords[:, :, 0]
+        cols = coords[:, :, 1]
+        
+        # Distâncias entre pares: matriz (n, k, k) por broadcasting
+        diff = coords[:, :, None, :] - coords[:, None, :, :]
+        sq = np.einsum('nijk,nijk->nij', diff, diff)
+        upper_r, upper_c = self._pair_index
+        distances = np.sqrt(sq[:, upper_r, upper_c])
+        
+        zeros = np.zeros(n_draws)
+        if distances.shape[1] > 0:
+            mean_distance = distances.mean(axis=1)
+            std_distance = distances.std(axis=1)
+            min_distance = distances.min(axis=1)
+            max_distance = distances.max(axis=1)
+        else:
+            mean_distance = std_distance = min_distance = max_distance = zeros
+        
+        mean_row = rows.mean(axis=1)
+        mean_col = cols.mean(axis=1)
+        count_top = self.top_half_mask[idx].sum(axis=1)
+        count_left = self.left_half_mask[idx].sum(axis=1)
+        quadrants = self.quadrant_id[idx]
+        
+        features = {
+            'mean_distance': mean_distance,
+            'std_distance': std_distance,
+            'min_distance': min_distance,
+            'max_distance': max_distance,
+            'mean_row': mean_row,
+            'std_row': rows.std(axis=1),
+            'mean_col': mean_col,
+            'std_col': cols.std(axis=1),
+            'spread_row': (rows.max(axis=1) - rows.min(axis=1)).astype(np.int64),
+            'spread_col': (cols.max(axis=1) - cols.min(axis=1)).astype(np.int64),
+            'count_top_half': count_top,
+            'count_bottom_half': size - count_top,
+            'count_left_half': count_left,
+            'count_right_half': size - count_left,
+            'count_border': self.border_mask[idx].sum(axis=1),
+        }
+        
+        for q in range(4):
+            features[f'quadrant_q{q + 1}'] = (quadrants == q).sum(axis=1)
+        
+        features['centroid_distance'] = np.sqrt(
+            (mean_row - self.center_row)**2 + (mean_col - self.center_col)**2
+        )
+        
+        features['spatial_autocorr'] = zeros
+        features['cluster_coefficient'] = zeros
+        if size > 1:
+            sq[:, self._diagonal, self._diagonal] = np.inf
+            features['mean_nearest_neighbor'] = np.sqrt(sq.min(axis=2)).mean(axis=1)
+        else:
+            features['mean_nearest_neighbor'] = zeros
+        features['convex_hull_area'] = zeros
+        features['entropy_spatial'] = zeros
+        features['dispersion_index'] = np.divide(
+            std_distance, mean_distance,
+            out=np.zeros(n_draws), where=mean_distance > 0
+        )
+        features['pattern_regularity'] = zeros
+        
+        return features
+    
+    def num_to_pos_array(self, nums: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Versão vetorizada de num_to_pos para vários números de uma vez.
+        
+        Args:
+            nums: Array (ou lista) de números da loteria
+        
+        Returns:
+            Tupla (rows, cols) de arrays int8 com índices base-0
+        
+        Raises:
+            ValueError: Se algum número estiver fora do intervalo
+        """
+        idx = np.asarray(nums) - self.min_number
+        if idx.size and (idx.min() < 0 or idx.max() >= self.total_numbers):
+            raise ValueError(
+                f"Números devem estar entre {self.min_number} e {self.max_number}"
+            )
+        return self.row_of[idx], self.col_of[idx]
+    
     def get_neighbors_4(self, row: int, col: int) -> List[Tuple[int, int]]:
         """
         Retorna vizinhos 4-conectados (cima, baixo, esquerda, direita).
@@ -156,15 +372,10 @@ class LotteryBase(ABC):
         Returns:
             Lista de tuplas (row, col) dos vizinhos válidos
         """
-        neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < self.grid_rows and 0 <= nc < self.grid_cols:
-                neighbors.append((nr, nc))
-        
-        return neighbors
+        cached = self._neighbors4.get((row, col))
+        if cached is None:
+            cached = self._compute_neighbors(row, col, self._DIRECTIONS_4)
+        return list(cached)
     
     def get_neighbors_8(self, row: int, col: int) -> List[Tuple[int, int]]:
         """
@@ -177,19 +388,10 @@ class LotteryBase(ABC):
         Returns:
             Lista de tuplas (row, col) dos vizinhos válidos
         """
-        neighbors = []
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < self.grid_rows and 0 <= nc < self.grid_cols:
-                neighbors.append((nr, nc))
-        
-        return neighbors
+        cached = self._neighbors8.get((row, col))
+        if cached is None:
+            cached = self._compute_neighbors(row, col, self._DIRECTIONS_8)
+        return list(cached)
     
     def get_quadrants(self) -> Dict[str, List[Tuple[int, int]]]:
         """
@@ -198,28 +400,20 @@ class LotteryBase(ABC):
         Returns:
             Dict com chaves 'q1', 'q2', 'q3', 'q4' contendo lista de posições
         """
-        mid_row = self.grid_rows // 2
-        mid_col = self.grid_cols // 2
+        return {key: list(positions) for key, positions in self._quadrants.items()}
+    
+    @cached_property
+    def quadrants(self) -> Dict[str, FrozenSet[Tuple[int, int]]]:
+        """
+        Quadrantes do volante como conjuntos imutáveis (montados uma vez).
         
-        quadrants = {
-            'q1': [],  # Superior esquerdo
-            'q2': [],  # Superior direito
-            'q3': [],  # Inferior esquerdo
-            'q4': []   # Inferior direito
-        }
+        Para testes de pertinência (`pos in lottery.quadrants['q1']`) sem
+        a cópia em listas que get_quadrants faz a cada chamada.
         
-        for row in range(self.grid_rows):
-            for col in range(self.grid_cols):
-                if row < mid_row and col < mid_col:
-                    quadrants['q1'].append((row, col))
-                elif row < mid_row and col >= mid_col:
-                    quadrants['q2'].append((row, col))
-                elif row >= mid_row and col < mid_col:
-                    quadrants['q3'].append((row, col))
-                else:
-                    quadrants['q4'].append((row, col))
-        
-        return quadrants
+        Returns:
+            Dict com chaves 'q1', 'q2', 'q3', 'q4' contendo frozensets de posições
+        """
+        return {key: frozenset(positions) for key, positions in self._quadrants.items()}
     
     def is_border(self, row: int, col: int) -> bool:
         """
@@ -232,10 +426,7 @@ class LotteryBase(ABC):
         Returns:
             True se está na borda
         """
-        return (
-            row == 0 or row == self.grid_rows - 1 or
-            col == 0 or col == self.grid_cols - 1
-        )
+        return (row, col) in self._border_set
     
     def is_corner(self, row: int, col: int) -> bool:
         """
@@ -248,13 +439,134 @@ class LotteryBase(ABC):
         Returns:
             True se está em um canto
         """
-        corners = [
+        return (row, col) in self._corner_set
+    
+    def _compute_neighbors(
+        self,
+        row: int,
+        col: int,
+        directions: Tuple[Tuple[int, int], ...]
+    ) -> Tuple[Tuple[int, int], ...]:
+        """
+        Calcula os vizinhos válidos de uma posição para os deslocamentos dados.
+        
+        Args:
+            row: Linha
+            col: Coluna
+            directions: Deslocamentos (dr, dc) a considerar
+            
+        Returns:
+            Tupla de posições (row, col) dentro do volante
+        """
+        return tuple(
+            (row + dr, col + dc)
+            for dr, dc in directions
+            if 0 <= row + dr < self.grid_rows and 0 <= col + dc < self.grid_cols
+        )
+    
+    def _build_grid_tables(self) -> None:
+        """
+        Pré-calcula vizinhanças, quadrantes, bordas e cantos do volante.
+        
+        Como a geometria do volante é fixa, esses dados são montados uma
+        única vez na construção e os acessores passam a ser consultas O(1).
+        """
+        rows, cols = self.grid_rows, self.grid_cols
+        mid_row = rows // 2
+        mid_col = cols // 2
+        
+        self._neighbors4: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+        self._neighbors8: Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]] = {}
+        quadrants: Dict[str, List[Tuple[int, int]]] = {
+            'q1': [],  # Superior esquerdo
+            'q2': [],  # Superior direito
+            'q3': [],  # Inferior esquerdo
+            'q4': []   # Inferior direito
+        }
+        border = []
+        
+        for row in range(rows):
+            for col in range(cols):
+                pos = (row, col)
+                self._neighbors4[pos] = self._compute_neighbors(row, col, self._DIRECTIONS_4)
+                self._neighbors8[pos] = self._compute_neighbors(row, col, self._DIRECTIONS_8)
+                
+                if row < mid_row and col < mid_col:
+                    quadrants['q1'].append(pos)
+                elif row < mid_row and col >= mid_col:
+                    quadrants['q2'].append(pos)
+                elif row >= mid_row and col < mid_col:
+                    quadrants['q3'].append(pos)
+                else:
+                    quadrants['q4'].append(pos)
+                
+                if row == 0 or row == rows - 1 or col == 0 or col == cols - 1:
+                    border.append(pos)
+        
+        self._quadrants: Dict[str, Tuple[Tuple[int, int], ...]] = {
+            key: tuple(positions) for key, positions in quadrants.items()
+        }
+        self._border_set = frozenset(border)
+        self._corner_set = frozenset([
             (0, 0),
-            (0, self.grid_cols - 1),
-            (self.grid_rows - 1, 0),
-            (self.grid_rows - 1, self.grid_cols - 1)
-        ]
-        return (row, col) in corners
+            (0, cols - 1),
+            (rows - 1, 0),
+            (rows - 1, cols - 1)
+        ])
+        
+        self._build_number_arrays()
+    
+    def _build_number_arrays(self) -> None:
+        """
+        Monta as tabelas espaciais indexadas por número (num - min_number).
+        
+        Permite calcular features de vários números com operações NumPy
+        vetorizadas, por exemplo:
+            np.bincount(self.quadrant_id[numbers - 1], minlength=4)
+        
+        Atributos criados:
+            adj4, adj8: Matrizes de adjacência (total_numbers × total_numbers)
+            quadrant_id: Quadrante (0-3) de cada número
+            border_mask, corner_mask: Números na borda / nos cantos
+            top_half_mask, left_half_mask: Números na metade superior / esquerda
+            row_of, col_of: Linha / coluna (int8) de cada número
+            coords_of: Matriz (total_numbers × 2) float64 com (row, col) de cada número
+        """
+        total = self.total_numbers
+        offset = self.min_number
+        quadrant_of = {
+            pos: index
+            for index, key in enumerate(('q1', 'q2', 'q3', 'q4'))
+            for pos in self._quadrants[key]
+        }
+        
+        self.adj4 = np.zeros((total, total), dtype=bool)
+        self.adj8 = np.zeros((total, total), dtype=bool)
+        self.quadrant_id = np.empty(total, dtype=np.int8)
+        self.border_mask = np.zeros(total, dtype=bool)
+        self.corner_mask = np.zeros(total, dtype=bool)
+        self.top_half_mask = np.zeros(total, dtype=bool)
+        self.left_half_mask = np.zeros(total, dtype=bool)
+        self.row_of = np.empty(total, dtype=np.int8)
+        self.col_of = np.empty(total, dtype=np.int8)
+        self.coords_of = np.empty((total, 2), dtype=np.float64)
+        
+        for num in range(self.min_number, self.max_number + 1):
+            pos = self.num_to_pos(num)
+            idx = num - offset
+            
+            for n_row, n_col in self._neighbors4[pos]:
+                self.adj4[idx, self.pos_to_num(n_row, n_col) - offset] = True
+            for n_row, n_col in self._neighbors8[pos]:
+                self.adj8[idx, self.pos_to_num(n_row, n_col) - offset] = True
+            
+            self.quadrant_id[idx] = quadrant_of[pos]
+            self.border_mask[idx] = pos in self._border_set
+            self.corner_mask[idx] = pos in self._corner_set
+            self.top_half_mask[idx] = pos[0] < self.half_rows
+            self.left_half_mask[idx] = pos[1] < self.half_cols
+            self.row_of[idx], self.col_of[idx] = pos
+            self.coords_of[idx] = pos
     
     def _validate_configuration(self) -> None:
         """
@@ -263,6 +575,12 @@ class LotteryBase(ABC):
         Raises:
             ValueError: Se configuração inválida
         """
+        missing = [attr for attr in self._CONFIG_ATTRIBUTES if not hasattr(self, attr)]
+        if missing:
+            raise ValueError(
+                f"{self.__class__.__name__} não define: {', '.join(missing)}"
+            )
+        
         if self.grid_rows <= 0 or self.grid_cols <= 0:
             raise ValueError("Dimensões do grid devem ser positivas")
         
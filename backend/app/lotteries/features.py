@@ -0,0 +1,52 @@
+"""
+Estrutura das features espaciais de um sorteio.
+
+Campos espelham as colunas do modelo DrawFeature.
+"""
+
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True, slots=True)
+class DrawFeatures:
+    """
+    Features calculadas para um sorteio (27 valores).
+    
+    Objeto imutável com slots fixos: mais leve que um dict por sorteio.
+    Converter com dataclasses.asdict() só na gravação (DrawFeature).
+    """
+    
+    # Features básicas (15)
+    mean_distance: float
+    std_distance: float
+    min_distance: float
+    max_distance: float
+    mean_row: float
+    std_row: float
+    mean_col: float
+    std_col: float
+    spread_row: int
+    spread_col: int
+    count_top_half: int
+    count_bottom_half: int
+    count_left_half: int
+    count_right_half: int
+    count_border: int
+    
+    # Features avançadas (12)
+    spatial_autocorr: float
+    cluster_coefficient: float
+    mean_nearest_neighbor: float
+    convex_hull_area: float
+    centroid_distance: float
+    quadrant_q1: int
+    quadrant_q2: int
+    quadrant_q3: int
+    quadrant_q4: int
+    entropy_spatial: float
+    dispersion_index: float
+    pattern_regularity: float
+
+
+# Nomes das features, na ordem dos campos
+FEATURE_NAMES = tuple(field.name for field in fields(DrawFeatures))
@@ -4,11 +4,19 @@ Implementação da Lotofácil.
 Grade 5×5 com numeração de 01 a 25.
 """
 
-from typing import List, Tuple, Dict
-import numpy as np
+from typing import Tuple
 from app.lotteries.base import LotteryBase
 
 
+# Tabelas de conversão pré-calculadas (volante 5×5, numeração por coluna)
+_NUM_TO_POS: Tuple[Tuple[int, int], ...] = tuple(
+    ((n - 1) % 5, (n - 1) // 5) for n in range(1, 26)
+)
+_POS_TO_NUM: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(c * 5 + r + 1 for c in range(5)) for r in range(5)
+)
+
+
 class Lotofacil(LotteryBase):
     """
     Loteria Lotofácil.
@@ -18,37 +26,14 @@ class Lotofacil(LotteryBase):
     - Sorteio: 15 números
     """
     
-    @property
-    def slug(self) -> str:
-        return "lotofacil"
-    
-    @property
-    def name(self) -> str:
-        return "Lotofácil"
-    
-    @property
-    def grid_rows(self) -> int:
-        return 5
-    
-    @property
-    def grid_cols(self) -> int:
-        return 5
-    
-    @property
-    def total_numbers(self) -> int:
-        return 25
-    
-    @property
-    def draw_size(self) -> int:
-        return 15
-    
-    @property
-    def min_number(self) -> int:
-        return 1
-    
-    @property
-    def max_number(self) -> int:
-        return 25
+    slug = "lotofacil"
+    name = "Lotofácil"
+    grid_rows = 5
+    grid_cols = 5
+    total_numbers = 25
+    draw_size = 15
+    min_number = 1
+    max_number = 25
     
     def num_to_pos(self, num: int) -> Tuple[int, int]:
         """
@@ -83,13 +68,14 @@ class Lotofacil(LotteryBase):
             >>> lotofacil.num_to_pos(13)
             (2, 2)
         """
-        if not (1 <= num <= 25):
+        # Índice negativo seria aceito pela tupla, então barra num < 1 antes
+        if num < 1:
             raise ValueError(f"Número {num} fora do intervalo [1, 25]")
         
-        col = (num - 1) // 5
-        row = (num - 1) % 5
-        
-        return (row, col)
+        try:
+            return _NUM_TO_POS[num - 1]
+        except (IndexError, TypeError):
+            raise ValueError(f"Número {num} fora do intervalo [1, 25]") from None
     
     def pos_to_num(self, row: int, col: int) -> int:
         """
@@ -114,86 +100,13 @@ class Lotofacil(LotteryBase):
             >>> lotofacil.pos_to_num(2, 2)
             13
         """
-        if not (0 <= row < 5 and 0 <= col < 5):
+        if row < 0 or col < 0:
             raise ValueError(f"Posição ({row}, {col}) inválida")
         
-        num = col * 5 + row + 1
-        
-        return num
-    
-    def calculate_features(self, numbers: List[int]) -> Dict:
-        """
-        Calcula features espaciais e estatísticas dos números sorteados.
-        
-        Args:
-            numbers: Lista de números sorteados
-            
-        Returns:
-            Dict com features calculadas (mapeadas para colunas do modelo DrawFeature)
-        """
-        if not self.validate_numbers(numbers):
-            raise ValueError(f"Números inválidos: {numbers}")
-        
-        # Converte números para posições
-        positions = [self.num_to_pos(n) for n in numbers]
-        rows = [pos[0] for pos in positions]
-        cols = [pos[1] for pos in positions]
-        
-        # Calcula distâncias entre todos os pares de números
-        from scipy.spatial import distance
-        import numpy as np
-        
-        coords = np.array(positions)
-        distances = distance.pdist(coords, metric='euclidean')
-        
-        # Features básicas mapeadas para o modelo
-        features = {
-            # Distâncias
-            'mean_distance': float(np.mean(distances)) if len(distances) > 0 else 0.0,
-            'std_distance': float(np.std(distances)) if len(distances) > 0 else 0.0,
-            'min_distance': float(np.min(distances)) if len(distances) > 0 else 0.0,
-            'max_distance': float(np.max(distances)) if len(distances) > 0 else 0.0,
-            
-            # Posições
-            'mean_row': float(np.mean(rows)),
-            'std_row': float(np.std(rows)),
-            'mean_col': float(np.mean(cols)),
-            'std_col': float(np.std(cols)),
-            'spread_row': int(max(rows) - min(rows)),
-            'spread_col': int(max(cols) - min(cols)),
-            
-            # Distribuição espacial
-            'count_top_half': sum(1 for r in rows if r < self.grid_rows / 2),
-            'count_bottom_half': sum(1 for r in rows if r >= self.grid_rows / 2),
-            'count_left_half': sum(1 for c in cols if c < self.grid_cols / 2),
-            'count_right_half': sum(1 for c in cols if c >= self.grid_cols / 2),
-            'count_border': sum(1 for pos in positions if self.is_border(pos[0], pos[1])),
-        }
-        
-        # Features avançadas
-        quadrants = self.get_quadrants()
-        features['quadrant_q1'] = sum(1 for pos in positions if pos in quadrants['q1'])
-        features['quadrant_q2'] = sum(1 for pos in positions if pos in quadrants['q2'])
-        features['quadrant_q3'] = sum(1 for pos in positions if pos in quadrants['q3'])
-        features['quadrant_q4'] = sum(1 for pos in positions if pos in quadrants['q4'])
-        
-        # Centróide e distância do centro
-        centroid_row = np.mean(rows)
-        centroid_col = np.mean(cols)
-        center_row = self.grid_rows / 2 - 0.5
-        center_col = self.grid_cols / 2 - 0.5
-        features['centroid_distance'] = float(np.sqrt((centroid_row - center_row)**2 + (centroid_col - center_col)**2))
-        
-        # Features avançadas (simplificadas por ora, podem ser melhoradas depois)
-        features['spatial_autocorr'] = 0.0  # TODO: Implementar I de Moran
-        features['cluster_coefficient'] = 0.0  # TODO: Implementar clustering
-        features['mean_nearest_neighbor'] = float(np.mean([np.min(distance.cdist([p], coords, metric='euclidean')[0][1:]) for p in coords])) if len(coords) > 1 else 0.0
-        features['convex_hull_area'] = 0.0  # TODO: Implementar convex hull
-        features['entropy_spatial'] = 0.0  # TODO: Implementar entropia
-        features['dispersion_index'] = float(np.std(distances) / np.mean(distances)) if np.mean(distances) > 0 else 0.0
-        features['pattern_regularity'] = 0.0  # TODO: Implementar regularidade
-        
-        return features
+        try:
+            return _POS_TO_NUM[row][col]
+        except (IndexError, TypeError):
+            raise ValueError(f"Posição ({row}, {col}) inválida") from None
 
 
 # Instância global (singleton pattern)
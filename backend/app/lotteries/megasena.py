@@ -4,8 +4,7 @@ Implementação da Mega-Sena.
 Migrado do código original em src/spatial.py para nova arquitetura.
 """
 
-from typing import List, Tuple, Dict
-import numpy as np
+from typing import Tuple
 from app.lotteries.base import LotteryBase
 
 
@@ -18,37 +17,14 @@ class MegaSena(LotteryBase):
     - Sorteio: 6 números
     """
     
-    @property
-    def slug(self) -> str:
-        return "megasena"
-    
-    @property
-    def name(self) -> str:
-        return "Mega-Sena"
-    
-    @property
-    def grid_rows(self) -> int:
-        return 10
-    
-    @property
-    def grid_cols(self) -> int:
-        return 6
-    
-    @property
-    def total_numbers(self) -> int:
-        return 60
-    
-    @property
-    def draw_size(self) -> int:
-        return 6
-    
-    @property
-    def min_number(self) -> int:
-        return 1
-    
-    @property
-    def max_number(self) -> int:
-        return 60
+    slug = "megasena"
+    name = "Mega-Sena"
+    grid_rows = 10
+    grid_cols = 6
+    total_numbers = 60
+    draw_size = 6
+    min_number = 1
+    max_number = 60
     
     def num_to_pos(self, num: int) -> Tuple[int, int]:
         """
@@ -125,80 +101,6 @@ class MegaSena(LotteryBase):
         num = col * 10 + row + 1
         
         return num
-    
-    def calculate_features(self, numbers: List[int]) -> Dict:
-        """
-        Calcula features espaciais e estatísticas dos números sorteados.
-        
-        Args:
-            numbers: Lista de números sorteados
-            
-        Returns:
-            Dict com features calculadas (mapeadas para colunas do modelo DrawFeature)
-        """
-        if not self.validate_numbers(numbers):
-            raise ValueError(f"Números inválidos: {numbers}")
-        
-        # Converte números para posições
-        positions = [self.num_to_pos(n) for n in numbers]
-        rows = [pos[0] for pos in positions]
-        cols = [pos[1] for pos in positions]
-        
-        # Calcula distâncias entre todos os pares de números
-        from scipy.spatial import distance
-        import numpy as np
-        
-        coords = np.array(positions)
-        distances = distance.pdist(coords, metric='euclidean')
-        
-        # Features básicas mapeadas para o modelo
-        features = {
-            # Distâncias
-            'mean_distance': float(np.mean(distances)) if len(distances) > 0 else 0.0,
-            'std_distance': float(np.std(distances)) if len(distances) > 0 else 0.0,
-            'min_distance': float(np.min(distances)) if len(distances) > 0 else 0.0,
-            'max_distance': float(np.max(distances)) if len(distances) > 0 else 0.0,
-            
-            # Posições
-            'mean_row': float(np.mean(rows)),
-            'std_row': float(np.std(rows)),
-            'mean_col': float(np.mean(cols)),
-            'std_col': float(np.std(cols)),
-            'spread_row': int(max(rows) - min(rows)),
-            'spread_col': int(max(cols) - min(cols)),
-            
-            # Distribuição espacial
-            'count_top_half': sum(1 for r in rows if r < self.grid_rows / 2),
-            'count_bottom_half': sum(1 for r in rows if r >= self.grid_rows / 2),
-            'count_left_half': sum(1 for c in cols if c < self.grid_cols / 2),
-            'count_right_half': sum(1 for c in cols if c >= self.grid_cols / 2),
-            'count_border': sum(1 for pos in positions if self.is_border(pos[0], pos[1])),
-        }
-        
-        # Features avançadas
-        quadrants = self.get_quadrants()
-        features['quadrant_q1'] = sum(1 for pos in positions if pos in quadrants['q1'])
-        features['quadrant_q2'] = sum(1 for pos in positions if pos in quadrants['q2'])
-        features['quadrant_q3'] = sum(1 for pos in positions if pos in quadrants['q3'])
-        features['quadrant_q4'] = sum(1 for pos in positions if pos in quadrants['q4'])
-        
-        # Centróide e distância do centro
-        centroid_row = np.mean(rows)
-        centroid_col = np.mean(cols)
-        center_row = self.grid_rows / 2 - 0.5
-        center_col = self.grid_cols / 2 - 0.5
-        features['centroid_distance'] = float(np.sqrt((centroid_row - center_row)**2 + (centroid_col - center_col)**2))
-        
-        # Features avançadas (simplificadas por ora, podem ser melhoradas depois)
-        features['spatial_autocorr'] = 0.0  # TODO: Implementar I de Moran
-        features['cluster_coefficient'] = 0.0  # TODO: Implementar clustering
-        features['mean_nearest_neighbor'] = float(np.mean([np.min(distance.cdist([p], coords, metric='euclidean')[0][1:]) for p in coords])) if len(coords) > 1 else 0.0
-        features['convex_hull_area'] = 0.0  # TODO: Implementar convex hull
-        features['entropy_spatial'] = 0.0  # TODO: Implementar entropia
-        features['dispersion_index'] = float(np.std(distances) / np.mean(distances)) if np.mean(distances) > 0 else 0.0
-        features['pattern_regularity'] = 0.0  # TODO: Implementar regularidade
-        
-        return features
 
 
 # Instância global (singleton pattern)
@@ -6,10 +6,13 @@ Backend para plataforma multi-loteria com suporte multi-database.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+import anyio.to_thread
+from sqlalchemy import inspect
 
 from app.config import settings
-from app.db import engine, get_db
+from app.db import engine, SessionLocal, get_pool_capacity
 from app.models import Base
 from app.services.lottery_service import LotteryService
 
@@ -17,12 +20,34 @@ from app.services.lottery_service import LotteryService
 from app.api.v1 import api_router
 
 
+def bootstrap_database() -> None:
+    """
+    Cria as tabelas e garante as loterias base (desenvolvimento).
+    
+    Síncrono (SQLAlchemy + drivers bloqueantes): deve rodar fora do
+    event loop, em thread do AnyIO.
+    """
+    # Uma única consulta lista as tabelas existentes; create_all só roda
+    # (sem checkfirst por tabela) para as que faltam
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+    if missing:
+        print(f"📦 Creating {len(missing)} database table(s)...")
+        Base.metadata.create_all(bind=engine, tables=missing, checkfirst=False)
+    
+    # Garantir que loterias base existem
+    print("🎲 Ensuring base lotteries exist...")
+    with SessionLocal() as db:
+        LotteryService.ensure_lotteries_exist(db)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Gerencia lifecycle da aplicação.
     
     Startup:
+    - Ajusta o threadpool à capacidade do pool de conexões
     - Cria tabelas no banco (dev only)
     - Inicializa cache
     
@@ -32,19 +57,18 @@ async def lifespan(app: FastAPI):
     # Startup
     print(f"🚀 Starting application with {settings.database_type} database...")
     
+    # Endpoints síncronos rodam no threadpool do AnyIO (40 threads por padrão);
+    # sem ajuste, a concorrência fica limitada a ele mesmo com pool maior no banco
+    pool_capacity = get_pool_capacity()
+    if pool_capacity:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = max(limiter.total_tokens, pool_capacity)
+    
     # Em produção, usar Alembic migrations
-    # Em desenvolvimento, criar tabelas automaticamente
+    # Em desenvolvimento, criar tabelas automaticamente (em thread, sem
+    # bloquear o event loop durante o I/O com o banco)
     if settings.environment == "development":
-        print("📦 Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        
-        # Garantir que loterias base existem
-        print("🎲 Ensuring base lotteries exist...")
-        db = next(get_db())
-        try:
-            LotteryService.ensure_lotteries_exist(db)
-        finally:
-            db.close()
+        await anyio.to_thread.run_sync(bootstrap_database)
     
     yield
     
@@ -71,6 +95,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão das respostas (frequência/análise são JSON grandes e repetitivos)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 
 # Health check
 @app.get("/health")
@@ -4,8 +4,8 @@ SQLAlchemy Base e utilitários comuns.
 Configuração agnóstica de banco de dados (PostgreSQL/Supabase/MSSQL).
 """
 
-from datetime import datetime
-from sqlalchemy import MetaData
+import re
+from sqlalchemy import MetaData, func
 from sqlalchemy.orm import DeclarativeBase, declared_attr
 from sqlalchemy import Column, DateTime
 
@@ -22,6 +22,9 @@ NAMING_CONVENTION = {
 
 metadata = MetaData(naming_convention=NAMING_CONVENTION)
 
+# Posições antes de letras maiúsculas (CamelCase -> snake_case)
+_CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
 
 class Base(DeclarativeBase):
     """
@@ -42,15 +45,15 @@ class Base(DeclarativeBase):
         Examples:
             User -> users
             DrawFeature -> draw_features
+            Address -> addresses
         """
-        # Converte CamelCase para snake_case e adiciona 's' no plural
-        name = cls.__name__
-        # Adiciona underscore antes de letras maiúsculas
-        import re
-        name = re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+        # Converte CamelCase para snake_case (underscore antes de maiúsculas)
+        name = _CAMEL_RE.sub('_', cls.__name__).lower()
         
-        # Adiciona 's' no plural (simplificado)
-        if not name.endswith('s'):
+        # Plural simplificado: 'ss' -> 'sses', demais terminados em 's' ficam iguais
+        if name.endswith('ss'):
+            name += 'es'
+        elif not name.endswith('s'):
             name += 's'
         
         return name
@@ -63,18 +66,26 @@ class TimestampMixin:
     Adiciona colunas:
     - created_at: Data de criação (preenchido automaticamente)
     - updated_at: Data de atualização (atualizado automaticamente)
+    
+    Os valores vêm do próprio banco (DEFAULT CURRENT_TIMESTAMP), uma vez
+    por comando, em vez de uma chamada Python por objeto inserido.
+    eager_defaults busca esses valores no próprio INSERT/UPDATE (RETURNING,
+    quando o banco suporta): com expire_on_commit=False eles não ficam
+    expirados, e lê-los com a sessão já fechada não falha.
     """
+    __mapper_args__ = {"eager_defaults": True}
+    
     created_at = Column(
         DateTime,
         nullable=False,
-        default=datetime.utcnow,
+        server_default=func.now(),
         comment="Data de criação do registro"
     )
     
     updated_at = Column(
         DateTime,
         nullable=False,
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        onupdate=func.now(),
         comment="Data da última atualização"
     )
@@ -4,12 +4,42 @@ Modelos de loterias e sorteios.
 Tabelas agnósticas de banco de dados.
 """
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Float, JSON, Boolean, Index, UniqueConstraint
+from typing import Iterable, Optional
+
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Date, ForeignKey, Float, Numeric, JSON, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base, TimestampMixin
 
 
+# Maior número representável em Draw.numbers_mask (BIGINT com sinal: bits 0..62)
+NUMBERS_MASK_MAX = 63
+
+
+def numbers_to_mask(numbers: Iterable[int]) -> Optional[int]:
+    """
+    Converte números sorteados em bitmask (bit n-1 ligado para o número n).
+    
+    Args:
+        numbers: Números sorteados
+    
+    Returns:
+        Bitmask ou None se algum número não couber em NUMBERS_MASK_MAX
+    """
+    mask = 0
+    for num in numbers:
+        if not 1 <= num <= NUMBERS_MASK_MAX:
+            return None
+        mask |= 1 << (num - 1)
+    return mask
+
+
+def _numbers_mask_default(context) -> Optional[int]:
+    """Default de Draw.numbers_mask calculado a partir de numbers no INSERT."""
+    return numbers_to_mask(context.get_current_parameters()["numbers"])
+
+
 class Lottery(Base, TimestampMixin):
     """
     Modelo de loteria.
@@ -56,8 +86,9 @@ class Draw(Base, TimestampMixin):
         lottery_id: FK para loteria
         contest_number: Número do concurso
         draw_date: Data do sorteio
-        numbers: Lista de números sorteados (JSON: [1, 5, 12, ...])
-        prize_value: Valor do prêmio principal (em centavos)
+        numbers: Lista de números sorteados ([1, 5, 12, ...])
+        numbers_mask: Bitmask dos números (bit n-1 = número n)
+        prize_value: Valor do prêmio principal (em R$, exato com centavos)
         winners: Quantidade de ganhadores
     """
     
@@ -66,22 +97,53 @@ class Draw(Base, TimestampMixin):
     contest_number = Column(Integer, nullable=False, comment="Número do concurso")
     draw_date = Column(Date, nullable=False, index=True, comment="Data do sorteio")
     
-    # Números sorteados (armazenados como JSON para compatibilidade multi-DB)
-    # PostgreSQL: pode usar ARRAY, mas JSON é universal
-    numbers = Column(JSON, nullable=False, comment="Números sorteados [1, 5, 12, ...]")
+    # Números sorteados: SMALLINT[] no PostgreSQL (sem parse de JSON e ~3x
+    # menor), JSON nos demais bancos para compatibilidade multi-DB
+    numbers = Column(
+        JSON().with_variant(ARRAY(SmallInteger), 'postgresql'),
+        nullable=False,
+        comment="Números sorteados [1, 5, 12, ...]"
+    )
+    
+    # Mesmos números como bitmask, preenchido no INSERT: pertinência e
+    # frequência viram operações de bit em SQL portável (PostgreSQL/MSSQL/SQLite).
+    # Nulo se a loteria tiver números acima de NUMBERS_MASK_MAX
+    numbers_mask = Column(
+        BigInteger,
+        nullable=True,
+        default=_numbers_mask_default,
+        comment="Bitmask dos números sorteados (bit n-1 = número n)"
+    )
     
     # Informações do prêmio
-    prize_value = Column(Float, nullable=True, comment="Valor do prêmio em R$ (float)")
+    # Numeric: valor exato (sem erro de ponto flutuante), lido como float
+    prize_value = Column(Numeric(15, 2, asdecimal=False), nullable=True, comment="Valor do prêmio em R$")
     winners = Column(Integer, nullable=True, comment="Quantidade de ganhadores")
     
     # Relacionamentos
     lottery = relationship("Lottery", back_populates="draws")
-    features = relationship("DrawFeature", back_populates="draw", cascade="all, delete-orphan", uselist=False)
+    # selectin: ler draw.features de vários sorteios é um único
+    # SELECT ... WHERE draw_id IN (...), nunca um SELECT por sorteio
+    features = relationship(
+        "DrawFeature",
+        back_populates="draw",
+        cascade="all, delete-orphan",
+        uselist=False,
+        lazy="selectin"
+    )
     
     # Índices compostos para consultas rápidas
     __table_args__ = (
         UniqueConstraint('lottery_id', 'contest_number', name='uq_lottery_contest'),
         Index('ix_lottery_date', 'lottery_id', 'draw_date'),
+        # Listagem paginada (ORDER BY contest_number DESC); inclui id para que
+        # a busca de ids da paginação por offset seja resolvida só pelo índice.
+        # Em PostgreSQL/MSSQL, INCLUDE cobre também a consulta do último sorteio
+        Index(
+            'ix_draws_lottery_contest_desc', 'lottery_id', contest_number.desc(), 'id',
+            postgresql_include=['draw_date', 'numbers'],
+            mssql_include=['draw_date', 'numbers'],
+        ),
     )
     
     def __repr__(self) -> str:
@@ -133,7 +195,7 @@ class DrawFeature(Base, TimestampMixin):
     id = Column(Integer, primary_key=True, index=True)
     draw_id = Column(Integer, ForeignKey('draws.id'), nullable=False, unique=True, index=True)
     
-    # Features básicas (15)
+    # Features básicas (15); contagens e amplitudes são pequenas (SMALLINT)
     mean_distance = Column(Float, comment="Distância média entre números")
     std_distance = Column(Float, comment="Desvio padrão das distâncias")
     min_distance = Column(Float, comment="Distância mínima")
@@ -142,13 +204,13 @@ class DrawFeature(Base, TimestampMixin):
     std_row = Column(Float, comment="Desvio padrão das linhas")
     mean_col = Column(Float, comment="Coluna média")
     std_col = Column(Float, comment="Desvio padrão das colunas")
-    spread_row = Column(Integer, comment="Amplitude das linhas")
-    spread_col = Column(Integer, comment="Amplitude das colunas")
-    count_top_half = Column(Integer, comment="Números metade superior")
-    count_bottom_half = Column(Integer, comment="Números metade inferior")
-    count_left_half = Column(Integer, comment="Números metade esquerda")
-    count_right_half = Column(Integer, comment="Números metade direita")
-    count_border = Column(Integer, comment="Números nas bordas")
+    spread_row = Column(SmallInteger, comment="Amplitude das linhas")
+    spread_col = Column(SmallInteger, comment="Amplitude das colunas")
+    count_top_half = Column(SmallInteger, comment="Números metade superior")
+    count_bottom_half = Column(SmallInteger, comment="Números metade inferior")
+    count_left_half = Column(SmallInteger, comment="Números metade esquerda")
+    count_right_half = Column(SmallInteger, comment="Números metade direita")
+    count_border = Column(SmallInteger, comment="Números nas bordas")
     
     # Features avançadas (12)
     spatial_autocorr = Column(Float, comment="I de Moran")
@@ -156,10 +218,10 @@ class DrawFeature(Base, TimestampMixin):
     mean_nearest_neighbor = Column(Float, comment="Dist. vizinho próximo")
     convex_hull_area = Column(Float, comment="Área polígono convexo")
     centroid_distance = Column(Float, comment="Distância do centro")
-    quadrant_q1 = Column(Integer, comment="Números quadrante 1")
-    quadrant_q2 = Column(Integer, comment="Números quadrante 2")
-    quadrant_q3 = Column(Integer, comment="Números quadrante 3")
-    quadrant_q4 = Column(Integer, comment="Números quadrante 4")
+    quadrant_q1 = Column(SmallInteger, comment="Números quadrante 1")
+    quadrant_q2 = Column(SmallInteger, comment="Números quadrante 2")
+    quadrant_q3 = Column(SmallInteger, comment="Números quadrante 3")
+    quadrant_q4 = Column(SmallInteger, comment="Números quadrante 4")
     entropy_spatial = Column(Float, comment="Entropia espacial")
     dispersion_index = Column(Float, comment="Índice de dispersão")
     pattern_regularity = Column(Float, comment="Regularidade do padrão")
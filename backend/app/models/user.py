@@ -20,6 +20,22 @@ class UserRole(str, enum.Enum):
     ADMIN = "admin"
 
 
+# Papéis com acesso premium (Individual ou superior)
+PREMIUM_ROLES = frozenset({UserRole.INDIVIDUAL, UserRole.MULTI, UserRole.COMPLETE, UserRole.ADMIN})
+
+# Papéis com acesso a todas as loterias
+ALL_LOTTERIES_ROLES = frozenset({UserRole.COMPLETE, UserRole.ADMIN})
+
+# Quantidade máxima de loterias por papel
+MAX_LOTTERIES_BY_ROLE = {
+    UserRole.FREE: 1,
+    UserRole.INDIVIDUAL: 1,
+    UserRole.MULTI: 3,
+    UserRole.COMPLETE: 999,  # Ilimitado
+    UserRole.ADMIN: 999,
+}
+
+
 class User(Base, TimestampMixin):
     """
     Modelo de usuário.
@@ -61,21 +77,14 @@ class User(Base, TimestampMixin):
     @property
     def has_premium_access(self) -> bool:
         """Verifica se usuário tem acesso premium (Individual ou superior)."""
-        return self.role in [UserRole.INDIVIDUAL, UserRole.MULTI, UserRole.COMPLETE, UserRole.ADMIN]
+        return self.role in PREMIUM_ROLES
     
     @property
     def can_access_all_lotteries(self) -> bool:
         """Verifica se usuário tem acesso a todas as loterias (Complete ou Admin)."""
-        return self.role in [UserRole.COMPLETE, UserRole.ADMIN]
+        return self.role in ALL_LOTTERIES_ROLES
     
     @property
     def max_lotteries(self) -> int:
         """Retorna quantidade máxima de loterias que o usuário pode acessar."""
-        limits = {
-            UserRole.FREE: 1,
-            UserRole.INDIVIDUAL: 1,
-            UserRole.MULTI: 3,
-            UserRole.COMPLETE: 999,  # Ilimitado
-            UserRole.ADMIN: 999,
-        }
-        return limits.get(self.role, 0)
+        return MAX_LOTTERIES_BY_ROLE.get(self.role, 0)
@@ -49,15 +49,13 @@ class DrawBase(BaseModel):
     @field_validator("numbers")
     @classmethod
     def validate_numbers(cls, v: List[int]) -> List[int]:
-        """Valida se números estão ordenados e não duplicados."""
-        if len(v) != len(set(v)):
+        """Valida se números não são duplicados e os retorna ordenados."""
+        # Uma única ordenação; a lista ordenada já é o valor retornado
+        numbers = sorted(v)
+        if len(set(numbers)) != len(numbers):
             raise ValueError("Números duplicados não são permitidos")
         
-        if v != sorted(v):
-            # Ordena automaticamente
-            return sorted(v)
-        
-        return v
+        return numbers
 
 
 class DrawCreate(DrawBase):
@@ -79,7 +77,9 @@ class DrawFeatureResponse(BaseModel):
     """Schema de resposta com features espaciais."""
     model_config = ConfigDict(from_attributes=True)
     
-    id: int
+    # id e timestamps ficam None quando as features foram calculadas sob
+    # demanda (DrawService.ensure_features) e ainda não estão gravadas
+    id: Optional[int] = None
     draw_id: int
     
     # Features básicas (15)
@@ -113,8 +113,8 @@ class DrawFeatureResponse(BaseModel):
     dispersion_index: float
     pattern_regularity: float
     
-    created_at: datetime
-    updated_at: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 
 class DrawWithFeaturesResponse(DrawResponse):
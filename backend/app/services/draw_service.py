@@ -4,14 +4,36 @@ Serviço de sorteios.
 Lógica de negócio para operações com sorteios (draws).
 """
 
-from typing import List, Optional
+from dataclasses import asdict
+import math
+from typing import Iterator, List, Optional
 from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+import numpy as np
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import desc, insert, lambda_stmt, select
+from sqlalchemy.engine import Row
 
-from app.models.lottery import Lottery, Draw, DrawFeature
+from app.models.lottery import Draw, DrawFeature
 from app.schemas.lottery import DrawCreate
 from app.lotteries import lottery_registry
+from app.services.lottery_service import LotteryService
+
+# Sorteios por INSERT em lote (e por commit) no bulk_import
+BULK_IMPORT_CHUNK_SIZE = 1000
+
+# Colunas de DrawResponse: a listagem lê só isso, sem montar objetos ORM
+DRAW_LIST_COLUMNS = (
+    Draw.id,
+    Draw.lottery_id,
+    Draw.contest_number,
+    Draw.draw_date,
+    Draw.numbers,
+    Draw.prize_value,
+    Draw.winners,
+    Draw.created_at,
+    Draw.updated_at,
+)
 
 
 class DrawService:
@@ -23,53 +45,133 @@ class DrawService:
         lottery_id: int,
         skip: int = 0,
         limit: int = 100,
-        order_desc: bool = True
-    ) -> List[Draw]:
+        order_desc: bool = True,
+        cursor: Optional[int] = None,
+        with_features: bool = False
+    ) -> List[Row]:
         """
         Lista sorteios de uma loteria (paginado).
         
+        Com `cursor` (último contest_number recebido) a paginação é por
+        chave: a consulta parte direto do índice (lottery_id, contest_number)
+        e `skip` é ignorado, então o custo não cresce com a profundidade.
+        Sem cursor, offsets > 0 usam deferred join (IDs primeiro, linhas depois).
+        
+        Por padrão retorna apenas as colunas de DrawResponse (DRAW_LIST_COLUMNS)
+        como linhas simples, sem carregar entidades ORM nem relacionamentos.
+        Com `with_features`, retorna objetos Draw com as features carregadas
+        em um único SELECT ... WHERE draw_id IN (...) (selectinload), sem N+1.
+        
         Args:
             db: Sessão do banco
             lottery_id: ID da loteria
-            skip: Quantos registros pular
+            skip: Quantos registros pular (ignorado se cursor informado)
             limit: Máximo de registros
             order_desc: Ordenar por concurso decrescente
+            cursor: Número do último concurso da página anterior
+            with_features: Carregar Draw completo + features
             
         Returns:
-            Lista de sorteios
+            Lista de linhas com os campos de DrawResponse (ou de Draw)
         """
-        query = db.query(Draw).filter(Draw.lottery_id == lottery_id)
+        order = desc(Draw.contest_number) if order_desc else Draw.contest_number
+        
+        def select_rows():
+            if with_features:
+                return db.query(Draw).options(selectinload(Draw.features))
+            return db.query(*DRAW_LIST_COLUMNS)
+        
+        if cursor is None and skip > 0:
+            # Deferred join: pagina só os IDs (varredura do índice) e depois
+            # busca as linhas completas apenas da página retornada
+            ids = [
+                draw_id for (draw_id,) in db.query(Draw.id)
+                .filter(Draw.lottery_id == lottery_id)
+                .order_by(order)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            ]
+            if not ids:
+                return []
+            
+            return (
+                select_rows()
+                .filter(Draw.id.in_(ids))
+                .order_by(order)
+                .all()
+            )
+        
+        query = select_rows().filter(Draw.lottery_id == lottery_id)
+        
+        if cursor is not None:
+            if order_desc:
+                query = query.filter(Draw.contest_number < cursor)
+            else:
+                query = query.filter(Draw.contest_number > cursor)
+        
+        return query.order_by(order).limit(limit).all()
+    
+    @staticmethod
+    def iter_by_lottery(
+        db: Session,
+        lottery_id: int,
+        batch_size: int = 1000
+    ) -> Iterator[Row]:
+        """
+        Percorre todos os sorteios de uma loteria sem carregá-los de uma vez.
+        
+        Usa cursor no servidor (stream_results) buscando `batch_size` linhas
+        por vez, então a memória fica constante independente do histórico.
         
-        if order_desc:
-            query = query.order_by(desc(Draw.contest_number))
-        else:
-            query = query.order_by(Draw.contest_number)
+        Args:
+            db: Sessão do banco (deve permanecer aberta durante a iteração)
+            lottery_id: ID da loteria
+            batch_size: Linhas buscadas por ida ao banco
         
-        return query.offset(skip).limit(limit).all()
+        Returns:
+            Iterador de linhas com os campos de DrawResponse, por concurso
+        """
+        return iter(
+            db.query(*DRAW_LIST_COLUMNS)
+            .filter(Draw.lottery_id == lottery_id)
+            .order_by(Draw.contest_number)
+            .yield_per(batch_size)
+        )
     
     @staticmethod
     def get_by_contest(
         db: Session,
         lottery_id: int,
-        contest_number: int
+        contest_number: int,
+        with_features: bool = False
     ) -> Optional[Draw]:
         """
         Busca sorteio específico por número do concurso.
         
+        Usa lambda_stmt: o SQL é compilado uma vez e reaproveitado do cache
+        de statements nas chamadas seguintes (só os parâmetros mudam).
+        
         Args:
             db: Sessão do banco
             lottery_id: ID da loteria
             contest_number: Número do concurso
+            with_features: Carregar as features no mesmo SELECT (JOIN),
+                evitando a consulta extra na serialização da resposta
             
         Returns:
             Sorteio encontrado ou None
         """
-        return db.query(Draw).filter(
-            and_(
+        stmt = lambda_stmt(
+            lambda: select(Draw).where(
                 Draw.lottery_id == lottery_id,
                 Draw.contest_number == contest_number
             )
-        ).first()
+        )
+        if with_features:
+            stmt += lambda s: s.options(joinedload(Draw.features))
+        
+        return db.execute(stmt).scalars().first()
     
     @staticmethod
     def create(db: Session, draw_data: DrawCreate) -> Draw:
@@ -87,6 +189,7 @@ class DrawService:
         db.add(draw)
         db.commit()
         db.refresh(draw)
+        DrawService._invalidate_caches(db, draw.lottery_id)
         return draw
     
     @staticmethod
@@ -101,23 +204,23 @@ class DrawService:
         Returns:
             Features calculadas
         """
-        # Buscar loteria
-        lottery = db.query(Lottery).filter(Lottery.id == draw.lottery_id).first()
-        if not lottery:
+        # Buscar loteria (slug em cache no processo)
+        slug = LotteryService.get_slug_by_id(db, draw.lottery_id)
+        if not slug:
             raise ValueError(f"Lottery {draw.lottery_id} not found")
         
         # Obter classe da loteria do registry
-        lottery_class = lottery_registry.get(lottery.slug)
+        lottery_class = lottery_registry.get(slug)
         if not lottery_class:
-            raise ValueError(f"Lottery class for '{lottery.slug}' not found in registry")
+            raise ValueError(f"Lottery class for '{slug}' not found in registry")
         
         # Calcular features
-        features_dict = lottery_class.calculate_features(draw.numbers)
+        draw_features = lottery_class.calculate_features(draw.numbers)
         
         # Criar modelo de features
         features = DrawFeature(
             draw_id=draw.id,
-            **features_dict
+            **asdict(draw_features)
         )
         
         db.add(features)
@@ -126,64 +229,306 @@ class DrawService:
         
         return features
     
+    @staticmethod
+    def ensure_features(db: Session, draw: Draw) -> Draw:
+        """
+        Calcula as features de um sorteio que ainda não as tem.
+        
+        Completa sob demanda os sorteios pulados por uma importação com
+        feature_sample_rate < 1. As features ficam só no objeto (DrawFeature
+        transiente, sem id) e não são gravadas: leituras não escrevem no banco.
+        Para persisti-las, use backfill_features.
+        
+        Args:
+            db: Sessão do banco
+            draw: Sorteio (com features carregadas ou None)
+        
+        Returns:
+            O próprio sorteio, com draw.features preenchido
+        """
+        if draw.features is not None:
+            return draw
+        
+        lottery_class = DrawService._get_lottery_class(db, draw.lottery_id)
+        if lottery_class:
+            features = DrawFeature(
+                draw_id=draw.id,
+                **asdict(lottery_class.calculate_features(draw.numbers))
+            )
+            set_committed_value(draw, "features", features)
+        return draw
+    
+    @staticmethod
+    def backfill_features(
+        db: Session,
+        lottery_id: int,
+        batch_size: int = BULK_IMPORT_CHUNK_SIZE
+    ) -> int:
+        """
+        Calcula e grava as features dos sorteios que ainda não as têm.
+        
+        Completa os sorteios pulados por uma importação com
+        feature_sample_rate < 1, em lotes vetorizados com commit por lote.
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+            batch_size: Sorteios por INSERT em lote (e por commit)
+        
+        Returns:
+            Quantidade de sorteios que receberam features
+        """
+        lottery_class = DrawService._get_lottery_class(db, lottery_id)
+        if not lottery_class:
+            raise ValueError(f"Lottery {lottery_id} has no registered implementation")
+        
+        missing = db.execute(
+            select(Draw.id, Draw.numbers)
+            .outerjoin(DrawFeature, DrawFeature.draw_id == Draw.id)
+            .where(Draw.lottery_id == lottery_id, DrawFeature.id.is_(None))
+            .order_by(Draw.id)
+        ).all()
+        
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            DrawService._add_features_batch(
+                db,
+                lottery_class,
+                [draw_id for draw_id, _ in chunk],
+                [numbers for _, numbers in chunk]
+            )
+            db.commit()
+        
+        return len(missing)
+    
+    @staticmethod
+    def _get_lottery_class(db: Session, lottery_id: int):
+        """
+        Retorna a implementação (registry) da loteria pelo ID.
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+        
+        Returns:
+            Instância de LotteryBase ou None
+        """
+        slug = LotteryService.get_slug_by_id(db, lottery_id)
+        return lottery_registry.get(slug) if slug else None
+    
+    @staticmethod
+    def _add_features_batch(
+        db: Session,
+        lottery_class,
+        draw_ids: List[int],
+        numbers: List[List[int]]
+    ) -> None:
+        """
+        Calcula e insere as features de vários sorteios de uma vez.
+        
+        Usa calculate_features_batch (vetorizado) em vez de uma chamada
+        de calculate_features por sorteio. Não faz commit.
+        
+        Args:
+            db: Sessão do banco
+            lottery_class: Implementação da loteria (registry)
+            draw_ids: IDs dos sorteios
+            numbers: Números de cada sorteio (mesma ordem de draw_ids)
+        """
+        if not draw_ids:
+            return
+        
+        columns = lottery_class.calculate_features_batch(np.array(numbers))
+        values = {name: column.tolist() for name, column in columns.items()}
+        
+        db.execute(
+            insert(DrawFeature).execution_options(
+                insertmanyvalues_page_size=BULK_IMPORT_CHUNK_SIZE
+            ),
+            [
+                {"draw_id": draw_id, **{name: column[i] for name, column in values.items()}}
+                for i, draw_id in enumerate(draw_ids)
+            ]
+        )
+    
+    @staticmethod
+    def _validate_batch(lottery_class, draws_data: List[dict]) -> List[bool]:
+        """
+        Valida os números de vários sorteios de uma vez.
+        
+        Args:
+            lottery_class: Implementação da loteria (registry) ou None
+            draws_data: Lista de dicionários com dados dos sorteios
+        
+        Returns:
+            Lista de booleanos (um por sorteio) indicando se é válido
+        """
+        if not lottery_class or not draws_data:
+            return [True] * len(draws_data)
+        
+        # Caminho vetorizado só se aplica quando todos têm o mesmo tamanho
+        if all(len(d["numbers"]) == lottery_class.draw_size for d in draws_data):
+            numbers = np.array([d["numbers"] for d in draws_data])
+            return lottery_class.validate_numbers_batch(numbers).tolist()
+        
+        return [lottery_class.validate_numbers(d["numbers"]) for d in draws_data]
+    
     @staticmethod
     def bulk_import(
         db: Session,
         lottery_id: int,
         draws_data: List[dict],
-        calculate_features: bool = True
+        calculate_features: bool = True,
+        feature_sample_rate: float = 1.0,
+        batch_size: int = BULK_IMPORT_CHUNK_SIZE
     ) -> int:
         """
         Importação em massa de sorteios.
         
+        Com `feature_sample_rate` < 1, só essa fração dos sorteios tem as
+        features calculadas na importação, distribuída de forma uniforme: o
+        i-ésimo sorteio importado é calculado quando floor((i + 1) * taxa)
+        passa de floor(i * taxa) (regra inteira, sem acumular erro de ponto
+        flutuante).
+        Os demais ficam sem DrawFeature: são calculados sob demanda na leitura
+        (ensure_features, sem gravar) e persistidos com backfill_features.
+        
         Args:
             db: Sessão do banco
             lottery_id: ID da loteria
             draws_data: Lista de dicionários com dados dos sorteios
             calculate_features: Se deve calcular features automaticamente
+            feature_sample_rate: Fração (0 a 1) dos sorteios com features na importação
+            batch_size: Sorteios por INSERT em lote (e por commit)
             
         Returns:
             Quantidade de sorteios importados
+        
+        Raises:
+            ValueError: Se feature_sample_rate estiver fora de [0, 1]
         """
-        imported = 0
+        if not 0 <= feature_sample_rate <= 1:
+            raise ValueError(f"feature_sample_rate must be between 0 and 1, got {feature_sample_rate}")
         
-        for data in draws_data:
-            # Verificar se já existe
-            existing = DrawService.get_by_contest(
-                db,
-                lottery_id,
-                data["contest_number"]
-            )
-            
-            if existing:
+        # Loteria e implementação resolvidas uma única vez para todo o lote
+        lottery_class = DrawService._get_lottery_class(db, lottery_id)
+        if calculate_features and not lottery_class:
+            print(f"⚠️  Loteria {lottery_id} sem implementação registrada, features não serão calculadas")
+            calculate_features = False
+        
+        # Validar todos os sorteios de uma vez antes de inserir
+        valid_mask = DrawService._validate_batch(lottery_class, draws_data)
+        
+        # Concursos já gravados, em uma única consulta (só a coluna)
+        existing = {
+            contest for (contest,) in db.query(Draw.contest_number)
+            .filter(Draw.lottery_id == lottery_id)
+            .all()
+        }
+        
+        rows: List[dict] = []
+        featured: List[bool] = []
+        for data, is_valid in zip(draws_data, valid_mask):
+            if not is_valid:
+                print(f"⚠️  Concurso {data['contest_number']}: números inválidos {data['numbers']}, pulando...")
                 continue
             
-            # Criar sorteio
-            draw = Draw(
-                lottery_id=lottery_id,
-                contest_number=data["contest_number"],
-                draw_date=data["draw_date"],
-                numbers=data["numbers"],
-                prize_value=data.get("prize_value"),
-                winners=data.get("winners"),
-            )
-            
-            db.add(draw)
-            db.flush()  # Para obter o ID
-            
-            # Calcular features se solicitado
-            if calculate_features:
-                try:
-                    DrawService.calculate_features(db, draw)
-                except Exception as e:
-                    print(f"⚠️  Erro ao calcular features do concurso {data['contest_number']}: {e}")
+            # Verificar se já existe (no banco ou repetido neste lote)
+            if data["contest_number"] in existing:
+                continue
+            existing.add(data["contest_number"])
             
-            imported += 1
+            rows.append({
+                "lottery_id": lottery_id,
+                "contest_number": data["contest_number"],
+                "draw_date": data["draw_date"],
+                "numbers": data["numbers"],
+                "prize_value": data.get("prize_value"),
+                "winners": data.get("winners"),
+            })
             
-            # Commit a cada 100 registros
-            if imported % 100 == 0:
-                db.commit()
-                print(f"  → {imported} sorteios importados...")
+            position = len(featured)
+            featured.append(
+                math.floor((position + 1) * feature_sample_rate) > math.floor(position * feature_sample_rate)
+            )
+        
+        # INSERT em lotes (executemany), com commit por lote
+        imported = 0
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            DrawService._insert_import_chunk(
+                db,
+                lottery_class if calculate_features else None,
+                chunk,
+                featured[start:start + batch_size]
+            )
+            imported += len(chunk)
+            print(f"  → {imported} sorteios importados...")
+        
+        if imported:
+            DrawService._invalidate_caches(db, lottery_id)
         
-        db.commit()
         return imported
+    
+    @staticmethod
+    def _insert_import_chunk(
+        db: Session,
+        lottery_class,
+        rows: List[dict],
+        featured: List[bool]
+    ) -> None:
+        """
+        Insere um lote de sorteios, calcula as features (se solicitado) e faz commit.
+        
+        Um único INSERT em lote (executemany) por tabela, sem a contabilidade
+        do unit of work por objeto.
+        
+        O "insertmanyvalues" do SQLAlchemy envia o lote como um INSERT de
+        várias linhas (VALUES (...), (...) RETURNING) em PostgreSQL, MSSQL e
+        SQLite. Os IDs são associados pelo contest_number retornado junto,
+        sem exigir RETURNING ordenado (sort_by_parameter_order), que em
+        alguns bancos força um INSERT por linha.
+        
+        Args:
+            db: Sessão do banco
+            lottery_class: Implementação da loteria; None para não calcular features
+            rows: Dicionários com as colunas de Draw
+            featured: Por sorteio, se calcula as features agora
+        """
+        id_by_contest = {
+            contest: draw_id
+            for draw_id, contest in db.execute(
+                insert(Draw)
+                .returning(Draw.id, Draw.contest_number)
+                .execution_options(insertmanyvalues_page_size=BULK_IMPORT_CHUNK_SIZE),
+                rows
+            )
+        }
+        sampled = [row for row, wanted in zip(rows, featured) if wanted]
+        
+        if lottery_class and sampled:
+            try:
+                DrawService._add_features_batch(
+                    db,
+                    lottery_class,
+                    [id_by_contest[row["contest_number"]] for row in sampled],
+                    [row["numbers"] for row in sampled]
+                )
+            except Exception as e:
+                contests = f"{rows[0]['contest_number']}-{rows[-1]['contest_number']}"
+                print(f"⚠️  Erro ao calcular features dos concursos {contests}: {e}")
+        
+        db.commit()
+    
+    @staticmethod
+    def _invalidate_caches(db: Session, lottery_id: int) -> None:
+        """
+        Invalida agregações em cache após inserir sorteios.
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+        """
+        lottery = LotteryService.get_by_id(db, lottery_id)
+        if lottery:
+            LotteryService.invalidate_draw_caches(lottery.slug, lottery.id)
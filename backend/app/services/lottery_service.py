@@ -4,13 +4,87 @@ Serviço de loterias.
 Lógica de negócio para operações com loterias.
 """
 
-from typing import List, Optional
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+import time
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import BigInteger, and_, case, func, insert, literal
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.models.lottery import Lottery, Draw
+from app.models.lottery import Lottery, Draw, NUMBERS_MASK_MAX
 from app.schemas.lottery import LotteryCreate
 from app.lotteries import lottery_registry
+from app.db.cache import redis_cached, cache_get, cache_set, cache_delete, model_to_dict, model_from_dict
+
+
+# TTL do cache de metadados das loterias (raramente mudam)
+LOTTERY_CACHE_TTL = 3600
+
+# TTL das agregações (só mudam quando um concurso novo é importado)
+AGGREGATES_CACHE_TTL = 86400
+
+# TTL da contagem exata de sorteios por loteria
+DRAW_COUNT_CACHE_TTL = 60
+
+# Quantidade de números mais frequentes na análise completa
+ANALYSIS_TOP_N = 10
+
+# Linhas por ida ao banco ao percorrer o histórico completo (yield_per)
+HISTORY_BATCH_SIZE = 500
+
+# Loterias base, criadas na inicialização se não existirem
+BASE_LOTTERIES = (
+    {
+        "slug": "megasena",
+        "name": "Mega-Sena",
+        "total_numbers": 60,
+        "draw_size": 6,
+        "grid_rows": 10,
+        "grid_cols": 6,
+        "is_active": True,
+    },
+    {
+        "slug": "lotofacil",
+        "name": "Lotofácil",
+        "total_numbers": 25,
+        "draw_size": 15,
+        "grid_rows": 5,
+        "grid_cols": 5,
+        "is_active": True,
+    },
+)
+
+
+def lottery_cache_key(slug: str) -> str:
+    """Chave do cache de metadados de uma loteria."""
+    return f"lottery:{slug}"
+
+
+def frequency_cache_key(slug: str) -> str:
+    """Chave do cache da frequência de números de uma loteria."""
+    return f"freq:{slug}"
+
+
+def analysis_cache_key(slug: str) -> str:
+    """Chave do cache da análise completa de uma loteria."""
+    return f"analysis:{slug}"
+
+
+def draw_count_cache_key(lottery_id: int) -> str:
+    """Chave do cache da contagem de sorteios de uma loteria."""
+    return f"drawcount:{lottery_id}"
+
+
+# Catálogo de loterias em memória: only_active -> (expira_em, linhas serializadas)
+_catalog_cache: Dict[bool, Tuple[float, List[dict]]] = {}
+
+# Slug de cada loteria por ID (o par ID/slug não muda depois de criado)
+_slug_cache: Dict[int, str] = {}
+
+# Loterias em memória por slug: slug -> (expira_em, linha serializada)
+_lottery_cache: Dict[str, Tuple[float, dict]] = {}
 
 
 class LotteryService:
@@ -21,6 +95,9 @@ class LotteryService:
         """
         Lista todas as loterias.
         
+        O catálogo é pequeno e quase estático, então fica em memória no
+        processo por LOTTERY_CACHE_TTL segundos (sem ida ao banco).
+        
         Args:
             db: Sessão do banco
             only_active: Retornar apenas loterias ativas
@@ -28,20 +105,60 @@ class LotteryService:
         Returns:
             Lista de loterias
         """
+        cached = _catalog_cache.get(only_active)
+        if cached and cached[0] > time.monotonic():
+            return [model_from_dict(Lottery, row) for row in cached[1]]
+        
         query = db.query(Lottery)
         if only_active:
             query = query.filter(Lottery.is_active == True)
-        return query.all()
+        lotteries = query.all()
+        
+        _catalog_cache[only_active] = (
+            time.monotonic() + LOTTERY_CACHE_TTL,
+            [model_to_dict(lottery) for lottery in lotteries],
+        )
+        return lotteries
     
     @staticmethod
     def get_by_slug(db: Session, slug: str) -> Optional[Lottery]:
         """
         Busca loteria por slug.
         
+        Fica em memória no processo por LOTTERY_CACHE_TTL segundos (como o
+        catálogo) e, abaixo disso, em cache no Redis (quando configurado).
+        
         Args:
             db: Sessão do banco
             slug: Identificador da loteria (ex: 'megasena')
-            
+        
+        Returns:
+            Loteria encontrada ou None
+        """
+        cached = _lottery_cache.get(slug)
+        if cached and cached[0] > time.monotonic():
+            return model_from_dict(Lottery, cached[1])
+        
+        lottery = LotteryService._load_by_slug(db, slug)
+        if lottery:
+            _lottery_cache[slug] = (time.monotonic() + LOTTERY_CACHE_TTL, model_to_dict(lottery))
+        return lottery
+    
+    @staticmethod
+    @redis_cached(
+        key_fn=lambda db, slug: lottery_cache_key(slug),
+        ttl=LOTTERY_CACHE_TTL,
+        dump=model_to_dict,
+        load=lambda data: model_from_dict(Lottery, data),
+    )
+    def _load_by_slug(db: Session, slug: str) -> Optional[Lottery]:
+        """
+        Busca loteria por slug no Redis ou no banco.
+        
+        Args:
+            db: Sessão do banco
+            slug: Identificador da loteria
+        
         Returns:
             Loteria encontrada ou None
         """
@@ -77,47 +194,72 @@ class LotteryService:
         db.add(lottery)
         db.commit()
         db.refresh(lottery)
+        cache_delete(lottery_cache_key(lottery.slug))
+        _catalog_cache.clear()
+        _slug_cache.clear()
+        _lottery_cache.clear()
         return lottery
     
+    @staticmethod
+    def get_slug_by_id(db: Session, lottery_id: int) -> Optional[str]:
+        """
+        Slug de uma loteria pelo ID.
+        
+        Fica em memória no processo após a primeira consulta, evitando um
+        SELECT por chamada em laços (ex.: cálculo de features).
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+        
+        Returns:
+            Slug da loteria ou None se não encontrada
+        """
+        slug = _slug_cache.get(lottery_id)
+        if slug is None:
+            slug = db.query(Lottery.slug).filter(Lottery.id == lottery_id).scalar()
+            if slug is not None:
+                _slug_cache[lottery_id] = slug
+        return slug
+    
     @staticmethod
     def ensure_lotteries_exist(db: Session) -> None:
         """
         Garante que as loterias base existem no banco.
         
-        Cria Mega-Sena e Lotofácil se não existirem.
+        Cria Mega-Sena e Lotofácil (BASE_LOTTERIES) se não existirem.
+        No PostgreSQL é um único INSERT ... ON CONFLICT (slug) DO NOTHING;
+        nos demais bancos, uma consulta dos slugs existentes e um único
+        INSERT com as que faltam.
         
         Args:
             db: Sessão do banco
         """
-        # Mega-Sena
-        if not LotteryService.get_by_slug(db, "megasena"):
-            megasena = Lottery(
-                slug="megasena",
-                name="Mega-Sena",
-                total_numbers=60,
-                draw_size=6,
-                grid_rows=10,
-                grid_cols=6,
-                is_active=True,
-            )
-            db.add(megasena)
-            print("✅ Criada loteria: Mega-Sena")
-        
-        # Lotofácil
-        if not LotteryService.get_by_slug(db, "lotofacil"):
-            lotofacil = Lottery(
-                slug="lotofacil",
-                name="Lotofácil",
-                total_numbers=25,
-                draw_size=15,
-                grid_rows=5,
-                grid_cols=5,
-                is_active=True,
-            )
-            db.add(lotofacil)
-            print("✅ Criada loteria: Lotofácil")
+        if db.get_bind().dialect.name == "postgresql":
+            created = db.execute(
+                pg_insert(Lottery)
+                .values(list(BASE_LOTTERIES))
+                .on_conflict_do_nothing(index_elements=["slug"])
+                .returning(Lottery.name)
+            ).scalars().all()
+        else:
+            existing = {
+                slug for (slug,) in db.query(Lottery.slug)
+                .filter(Lottery.slug.in_([lottery["slug"] for lottery in BASE_LOTTERIES]))
+                .all()
+            }
+            missing = [lottery for lottery in BASE_LOTTERIES if lottery["slug"] not in existing]
+            if missing:
+                db.execute(insert(Lottery), missing)
+            created = [lottery["name"] for lottery in missing]
+        
+        for name in created:
+            print(f"✅ Criada loteria: {name}")
         
         db.commit()
+        _catalog_cache.clear()
+        _slug_cache.clear()
+        _lottery_cache.clear()
     
     @staticmethod
     def get_stats(db: Session, slug: str) -> dict:
@@ -135,15 +277,35 @@ class LotteryService:
         if not lottery:
             return {}
         
-        # Contagem de sorteios
-        total_draws = db.query(func.count(Draw.id)).filter(
-            Draw.lottery_id == lottery.id
-        ).scalar()
+        return LotteryService.get_stats_for_lottery(db, lottery)
+    
+    @staticmethod
+    def get_stats_for_lottery(db: Session, lottery: Lottery) -> dict:
+        """
+        Estatísticas gerais de uma loteria já carregada.
         
-        # Último sorteio
-        last_draw = db.query(Draw).filter(
-            Draw.lottery_id == lottery.id
-        ).order_by(Draw.contest_number.desc()).first()
+        Evita resolver o slug novamente quando o chamador já tem a loteria.
+        Com a contagem em cache, busca só o último sorteio; sem ela, total e
+        último sorteio vêm de uma única consulta (e a contagem vai para o cache).
+        
+        Args:
+            db: Sessão do banco
+            lottery: Loteria
+        
+        Returns:
+            Dicionário com estatísticas
+        """
+        total_draws = cache_get(draw_count_cache_key(lottery.id))
+        
+        if total_draws is None:
+            total_draws, last_draw = LotteryService._count_and_last_draw(db, lottery.id)
+            if total_draws:
+                cache_set(draw_count_cache_key(lottery.id), total_draws, DRAW_COUNT_CACHE_TTL)
+        else:
+            # Último sorteio (só as colunas cobertas por ix_draws_lottery_contest_desc)
+            last_draw = db.query(Draw.contest_number, Draw.draw_date, Draw.numbers).filter(
+                Draw.lottery_id == lottery.id
+            ).order_by(Draw.contest_number.desc()).first()
         
         return {
             "lottery": {
@@ -159,10 +321,86 @@ class LotteryService:
         }
     
     @staticmethod
+    def _count_and_last_draw(db: Session, lottery_id: int) -> Tuple[int, Optional[Row]]:
+        """
+        Total de sorteios e último sorteio em uma única consulta.
+        
+        Agrega COUNT e MAX(contest_number) e faz LEFT JOIN com o sorteio
+        desse concurso (SQL portável, sem CTE específica de banco).
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+        
+        Returns:
+            Tupla (total de sorteios, linha com contest_number/draw_date/numbers ou None)
+        """
+        totals = (
+            db.query(
+                func.count(Draw.id).label("total_draws"),
+                func.max(Draw.contest_number).label("last_contest"),
+            )
+            .filter(Draw.lottery_id == lottery_id)
+            .subquery()
+        )
+        row = (
+            db.query(totals.c.total_draws, Draw.contest_number, Draw.draw_date, Draw.numbers)
+            .select_from(totals)
+            .outerjoin(
+                Draw,
+                and_(Draw.lottery_id == lottery_id, Draw.contest_number == totals.c.last_contest)
+            )
+            .one()
+        )
+        
+        return row.total_draws, row if row.contest_number is not None else None
+    
+    @staticmethod
+    @redis_cached(key_fn=lambda db, lottery_id: draw_count_cache_key(lottery_id), ttl=DRAW_COUNT_CACHE_TTL)
+    def get_draw_count(db: Session, lottery_id: int) -> int:
+        """
+        Quantidade de sorteios de uma loteria.
+        
+        O COUNT(*) percorre o índice inteiro da loteria, então o resultado
+        fica em cache por DRAW_COUNT_CACHE_TTL segundos (e é invalidado
+        quando sorteios são inseridos). Use no lugar de COUNT inline.
+        
+        Args:
+            db: Sessão do banco
+            lottery_id: ID da loteria
+        
+        Returns:
+            Total de sorteios
+        """
+        return db.query(func.count(Draw.id)).filter(
+            Draw.lottery_id == lottery_id
+        ).scalar() or 0
+    
+    @staticmethod
+    def invalidate_draw_caches(slug: str, lottery_id: int) -> None:
+        """
+        Invalida as agregações em cache de uma loteria.
+        
+        Deve ser chamado sempre que sorteios forem inseridos.
+        
+        Args:
+            slug: Slug da loteria
+            lottery_id: ID da loteria
+        """
+        cache_delete(
+            frequency_cache_key(slug),
+            analysis_cache_key(slug),
+            draw_count_cache_key(lottery_id),
+        )
+    
+    @staticmethod
+    @redis_cached(key_fn=lambda db, slug: frequency_cache_key(slug), ttl=AGGREGATES_CACHE_TTL)
     def get_frequency(db: Session, slug: str) -> dict:
         """
         Frequência de números sorteados.
         
+        Resultado fica em cache até a próxima importação de sorteios.
+        
         Args:
             db: Sessão do banco
             slug: Slug da loteria
@@ -174,20 +412,199 @@ class LotteryService:
         if not lottery:
             return {}
         
-        # Buscar todos os sorteios
-        draws = db.query(Draw.numbers).filter(
+        return {
+            "lottery": lottery.slug,
+            **LotteryService._frequency_counts(db, lottery),
+        }
+    
+    @staticmethod
+    def _frequency_counts(db: Session, lottery: Lottery) -> dict:
+        """
+        Frequência de números pelo caminho mais barato do banco em uso.
+        
+        Args:
+            db: Sessão do banco
+            lottery: Loteria
+        
+        Returns:
+            Dicionário com total_draws e frequency (lista de _frequency_list)
+        """
+        # PostgreSQL: agregação no próprio banco, sem trazer os sorteios
+        if db.get_bind().dialect.name == "postgresql":
+            return LotteryService._count_frequency_sql(db, lottery)
+        
+        # Demais bancos: agregação por bits de numbers_mask, também no banco
+        if lottery.total_numbers <= NUMBERS_MASK_MAX:
+            return LotteryService._count_frequency_mask(db, lottery)
+        
+        # Números que não cabem no bitmask: COUNT(*) no banco e contagem em
+        # Python consumindo a coluna numbers em lotes, sem materializar o histórico
+        total_draws = LotteryService.get_draw_count(db, lottery.id)
+        counts = LotteryService._count_numbers(
+            lottery.total_numbers,
+            (
+                numbers for (numbers,) in db.query(Draw.numbers)
+                .filter(Draw.lottery_id == lottery.id)
+                .yield_per(HISTORY_BATCH_SIZE)
+            )
+        )
+        
+        return {
+            "total_draws": total_draws,
+            "frequency": LotteryService._frequency_list(lottery.total_numbers, counts, total_draws),
+        }
+    
+    @staticmethod
+    def _count_frequency_sql(db: Session, lottery: Lottery) -> dict:
+        """
+        Frequência de números agregada no banco (PostgreSQL).
+        
+        Expande o array de cada sorteio com unnest e agrupa por número,
+        trafegando uma linha por número em vez de todos os sorteios.
+        
+        Args:
+            db: Sessão do banco
+            lottery: Loteria
+        
+        Returns:
+            Dicionário com total_draws e frequency (lista de _frequency_list)
+        """
+        number = func.unnest(Draw.numbers).column_valued("number")
+        counts = dict(
+            db.query(number, func.count())
+            .select_from(Draw)
+            .filter(Draw.lottery_id == lottery.id)
+            .group_by(number)
+            .all()
+        )
+        total_draws = db.query(func.count(Draw.id)).filter(
+            Draw.lottery_id == lottery.id
+        ).scalar()
+        
+        return {
+            "total_draws": total_draws,
+            "frequency": LotteryService._frequency_list(
+                lottery.total_numbers, counts, total_draws
+            ),
+        }
+    
+    @staticmethod
+    def _count_frequency_mask(db: Session, lottery: Lottery) -> dict:
+        """
+        Frequência de números agregada no banco a partir de numbers_mask.
+        
+        Uma única linha de resposta: SUM do teste de bit de cada número,
+        em SQL portável (PostgreSQL, MSSQL e SQLite).
+        
+        Args:
+            db: Sessão do banco
+            lottery: Loteria (total_numbers <= NUMBERS_MASK_MAX)
+        
+        Returns:
+            Dicionário com total_draws e frequency (lista de _frequency_list)
+        """
+        bit_counts = [
+            func.sum(case(
+                (Draw.numbers_mask.op("&")(literal(1 << (num - 1), BigInteger)) != 0, 1),
+                else_=0
+            ))
+            for num in range(1, lottery.total_numbers + 1)
+        ]
+        total_draws, *counts = db.query(func.count(Draw.id), *bit_counts).filter(
             Draw.lottery_id == lottery.id
-        ).all()
+        ).one()
         
-        # Contar frequência
-        frequency = {}
-        for i in range(1, lottery.total_numbers + 1):
-            frequency[i] = 0
+        return {
+            "total_draws": total_draws,
+            "frequency": LotteryService._frequency_list(
+                lottery.total_numbers,
+                {num: count or 0 for num, count in enumerate(counts, start=1)},
+                total_draws
+            ),
+        }
+    
+    @staticmethod
+    @redis_cached(key_fn=lambda db, slug: analysis_cache_key(slug), ttl=AGGREGATES_CACHE_TTL)
+    def get_analysis_bundle(db: Session, slug: str) -> dict:
+        """
+        Análise completa de uma loteria (estatísticas + frequência).
+        
+        Resolve a loteria uma única vez; o total e o último sorteio vêm de uma
+        consulta agregada (_count_and_last_draw) e a frequência da mesma
+        agregação no banco usada por get_frequency, sem trazer os sorteios.
+        Fica em cache (já recortada em ANALYSIS_TOP_N) separado da frequência
+        completa.
         
-        for (numbers,) in draws:
-            for num in numbers:
-                if num in frequency:
-                    frequency[num] += 1
+        Args:
+            db: Sessão do banco
+            slug: Slug da loteria
+        
+        Returns:
+            Dicionário com loteria, estatísticas e frequência (vazio se não encontrada)
+        """
+        lottery = LotteryService.get_by_slug(db, slug)
+        if not lottery:
+            return {}
+        
+        total_draws, last_draw = LotteryService._count_and_last_draw(db, lottery.id)
+        frequency = LotteryService._frequency_counts(db, lottery)["frequency"]
+        
+        return {
+            "lottery": {
+                "slug": lottery.slug,
+                "name": lottery.name,
+                "total_numbers": lottery.total_numbers,
+                "draw_size": lottery.draw_size,
+            },
+            "statistics": {
+                "total_draws": total_draws or 0,
+                "last_contest": last_draw.contest_number if last_draw else None,
+                "last_draw_date": last_draw.draw_date.isoformat() if last_draw else None,
+                "last_numbers": last_draw.numbers if last_draw else None,
+            },
+            "frequency": frequency[:ANALYSIS_TOP_N],
+        }
+    
+    @staticmethod
+    def _count_numbers(total_numbers: int, draws_numbers: Iterable[List[int]]) -> Dict[int, int]:
+        """
+        Contagem de cada número com bincount acumulado por lote.
+        
+        Aceita qualquer iterável (ex.: gerador sobre um yield_per), consumido
+        uma única vez: cada lote de HISTORY_BATCH_SIZE sorteios é somado às
+        contagens e descartado, então só as contagens ficam em memória.
+        
+        Args:
+            total_numbers: Total de números da loteria
+            draws_numbers: Números de cada sorteio
+        
+        Returns:
+            Contagem por número
+        """
+        counts = np.zeros(total_numbers + 1, dtype=np.int64)
+        draws = iter(draws_numbers)
+        while True:
+            batch = list(islice(draws, HISTORY_BATCH_SIZE))
+            if not batch:
+                break
+            flat = np.fromiter((num for numbers in batch for num in numbers), dtype=np.int32)
+            counts += np.bincount(flat, minlength=total_numbers + 1)[:total_numbers + 1]
+        return dict(enumerate(counts.tolist()))
+    
+    @staticmethod
+    def _frequency_list(total_numbers: int, counts: Dict[int, int], total_draws: int) -> List[dict]:
+        """
+        Monta a lista de frequência a partir das contagens por número.
+        
+        Args:
+            total_numbers: Total de números da loteria
+            counts: Contagem por número (números ausentes contam zero)
+            total_draws: Total de sorteios considerados
+        
+        Returns:
+            Lista ordenada (mais frequente primeiro) com número, contagem e percentual
+        """
+        frequency = {i: counts.get(i, 0) for i in range(1, total_numbers + 1)}
         
         # Ordenar por frequência
         sorted_freq = sorted(
@@ -196,11 +613,7 @@ class LotteryService:
             reverse=True
         )
         
-        return {
-            "lottery": lottery.slug,
-            "total_draws": len(draws),
-            "frequency": [
-                {"number": num, "count": count, "percentage": round(count / len(draws) * 100, 2) if draws else 0}
-                for num, count in sorted_freq
-            ]
-        }
+        return [
+            {"number": num, "count": count, "percentage": round(count / total_draws * 100, 2) if total_draws else 0}
+            for num, count in sorted_freq
+        ]
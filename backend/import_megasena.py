@@ -4,47 +4,266 @@ Script de importação de dados históricos da Mega-Sena.
 Lê dados do arquivo Excel e importa para o banco de dados.
 """
 
+import importlib.util
 import sys
+from itertools import islice
 from pathlib import Path
-from datetime import datetime
+from typing import Dict, Iterator
 
 # Adicionar backend ao path
 backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
+import numpy as np
+import openpyxl
 import pandas as pd
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
 from app.services.lottery_service import LotteryService
-from app.services.draw_service import DrawService
+from app.services.draw_service import BULK_IMPORT_CHUNK_SIZE, DrawService
 
 
-def parse_date(date_str):
+REQUIRED_COLUMNS = ['Concurso', 'Data do Sorteio']
+BALL_COLUMNS = [f'Bola{i}' for i in range(1, 7)]
+PRIZE_COLUMN = 'Rateio 6 acertos'
+WINNERS_COLUMN = 'Ganhadores 6 acertos'
+USED_COLUMNS = frozenset(REQUIRED_COLUMNS + BALL_COLUMNS + [PRIZE_COLUMN, WINNERS_COLUMN])
+
+# Linhas por bloco na leitura em streaming (--chunk-size)
+STREAM_CHUNK_SIZE = 10_000
+
+
+def excel_engine():
+    """
+    Escolhe o leitor de Excel.
+    
+    Usa o calamine (bem mais rápido) quando python-calamine está instalado e
+    o pandas o suporta (>= 2.2); caso contrário, openpyxl.
     """
-    Parse data do formato dd/mm/yyyy.
+    pandas_version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    if pandas_version >= (2, 2) and importlib.util.find_spec("python_calamine"):
+        return "calamine"
+    return "openpyxl"
+
+
+def used_column_positions(header: list) -> Dict[int, str]:
+    """
+    Decide, uma vez pelo cabeçalho, de quais colunas da planilha ler cada campo.
+    
+    Se não houver colunas Bola1..Bola6, os números são as 6 colunas após
+    'Data do Sorteio'.
     
     Args:
-        date_str: String com data
+        header: Nomes das colunas da planilha, na ordem
+    
+    Returns:
+        Índice da coluna na planilha -> nome usado na importação
+    """
+    positions = {idx: name for idx, name in enumerate(header) if name in USED_COLUMNS}
+    if 'Data do Sorteio' in header and not any(col in header for col in BALL_COLUMNS):
+        data_idx = header.index('Data do Sorteio')
+        for name, idx in zip(BALL_COLUMNS, range(data_idx + 1, min(data_idx + 7, len(header)))):
+            positions[idx] = name
+    return dict(sorted(positions.items()))
+
+
+def read_draws_excel(excel_file: Path, limit: int = None) -> pd.DataFrame:
+    """
+    Lê do Excel apenas as colunas usadas na importação.
+    
+    O cabeçalho é lido primeiro para escolher as colunas (por nome ou por
+    posição, ver used_column_positions) e a planilha é lida uma única vez.
+    As bolas viram inteiros (células não numéricas viram NA e a linha é
+    descartada em build_draws_data) e a data é convertida de uma vez para a
+    coluna inteira.
+    
+    Args:
+        excel_file: Caminho do arquivo Excel
+        limit: Limite de linhas (None = todas)
         
     Returns:
-        datetime.date
+        DataFrame com as colunas usadas (datas inválidas como NaT)
     """
-    if pd.isna(date_str):
-        return None
+    engine = excel_engine()
+    header = list(pd.read_excel(excel_file, nrows=0, engine=engine).columns)
+    positions = used_column_positions(header)
     
+    df = pd.read_excel(
+        excel_file,
+        usecols=list(positions),
+        nrows=limit or None,
+        engine=engine,
+    )
+    df.columns = list(positions.values())
+    
+    for col in BALL_COLUMNS:
+        if col in df.columns:
+            df[col] = to_ball_numbers(df[col])
+    
+    if 'Data do Sorteio' in df.columns:
+        df['Data do Sorteio'] = parse_draw_dates(df['Data do Sorteio'])
+    
+    return df
+
+
+def to_ball_numbers(raw_balls: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de bolas para Int16, sem abortar em células ruins.
+    
+    Valores não numéricos, fracionários ou fora do alcance de Int16 viram NA.
+    
+    Args:
+        raw_balls: Valores lidos da planilha
+    
+    Returns:
+        Série Int16 (células inválidas como NA)
+    """
+    values = pd.to_numeric(raw_balls, errors="coerce")
+    values = values.where((values == values.round()) & (values.abs() <= np.iinfo(np.int16).max))
+    return values.astype("Int16")
+
+
+def parse_draw_dates(raw_dates: pd.Series) -> pd.Series:
+    """
+    Converte a coluna de datas de uma vez (dd/mm/yyyy, depois outros formatos).
+    
+    Args:
+        raw_dates: Valores lidos da planilha (texto ou datas)
+    
+    Returns:
+        Série datetime64 (datas inválidas como NaT)
+    """
+    dates = pd.to_datetime(raw_dates, format="%d/%m/%Y", errors="coerce")
+    # Outros formatos (ex.: células de data já tipadas no Excel)
+    missing = dates.isna() & raw_dates.notna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(raw_dates[missing], format="mixed", errors="coerce")
+    return dates
+
+
+def iter_draws_excel(
+    excel_file: Path,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    limit: int = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê o Excel em blocos de linhas, sem carregar a planilha inteira.
+    
+    Usa o modo read_only do openpyxl e produz DataFrames no mesmo formato
+    de read_draws_excel, com no máximo `chunk_size` linhas cada.
+    
+    Args:
+        excel_file: Caminho do arquivo Excel
+        chunk_size: Linhas por bloco
+        limit: Limite de linhas (None = todas)
+    
+    Yields:
+        DataFrame com as colunas usadas (datas inválidas como NaT)
+    """
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
     try:
-        # Formato dd/mm/yyyy
-        return datetime.strptime(str(date_str), "%d/%m/%Y").date()
-    except:
-        try:
-            # Tentar outros formatos
-            return pd.to_datetime(date_str).date()
-        except:
-            return None
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        
+        positions = used_column_positions(header)
+        
+        if limit:
+            rows = islice(rows, limit)
+        
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            
+            df = pd.DataFrame(
+                [[row[idx] if idx < len(row) else None for idx in positions] for row in batch],
+                columns=list(positions.values()),
+            )
+            for col in BALL_COLUMNS:
+                if col in df.columns:
+                    df[col] = to_ball_numbers(df[col])
+            if 'Data do Sorteio' in df.columns:
+                df['Data do Sorteio'] = parse_draw_dates(df['Data do Sorteio'])
+            yield df
+    finally:
+        workbook.close()
+
 
+def build_draws_data(df: pd.DataFrame) -> list:
+    """
+    Monta os sorteios a importar a partir das colunas do DataFrame.
+    
+    Validação e ordenação dos números são feitas em lote com NumPy; linhas
+    inválidas são reportadas e descartadas.
+    
+    Args:
+        df: DataFrame retornado por read_draws_excel
+    
+    Returns:
+        Lista de dicionários aceitos por DrawService.bulk_import
+    """
+    ball_columns = [col for col in BALL_COLUMNS if col in df.columns]
+    balls = df[ball_columns]
+    
+    contests = df['Concurso'].to_numpy(np.int64)
+    dates = df['Data do Sorteio']
+    nums = balls.fillna(0).to_numpy(np.int32)
+    nums.sort(axis=1)
+    
+    # Uma única máscara de valores presentes para datas e bolas
+    present = df.notna()
+    ball_counts = present[ball_columns].to_numpy().sum(axis=1)
+    has_date = present['Data do Sorteio'].to_numpy()
+    complete = ball_counts == 6
+    in_range = ((nums >= 1) & (nums <= 60)).all(axis=1)
+    valid = has_date & complete & in_range
+    
+    for idx in np.flatnonzero(~valid):
+        contest_number = contests[idx]
+        if not has_date[idx]:
+            print(f"⚠️  Concurso {contest_number}: data inválida, pulando...")
+        elif not complete[idx]:
+            print(f"⚠️  Concurso {contest_number}: esperados 6 números, encontrados {ball_counts[idx]}, pulando...")
+        else:
+            print(f"⚠️  Concurso {contest_number}: números fora de 1-60, pulando...")
+    
+    # Prêmio e ganhadores são opcionais; valores não numéricos viram None
+    def optional_column(name):
+        if name not in df.columns:
+            return [None] * int(valid.sum())
+        values = pd.to_numeric(df[name], errors="coerce").astype(float)[valid]
+        return values.astype(object).where(values.notna(), None).tolist()
+    
+    prizes = optional_column(PRIZE_COLUMN)
+    winners = [None if w is None else int(w) for w in optional_column(WINNERS_COLUMN)]
+    
+    return [
+        {
+            "contest_number": int(contest),
+            "draw_date": draw_date,
+            "numbers": numbers,
+            "prize_value": prize,
+            "winners": winner,
+        }
+        for contest, draw_date, numbers, prize, winner in zip(
+            contests[valid].tolist(),
+            dates[valid].dt.date.tolist(),
+            nums[valid].tolist(),
+            prizes,
+            winners,
+        )
+    ]
 
-def import_megasena(db: Session, excel_file: Path, limit: int = None, auto_confirm: bool = False):
+
+def import_megasena(
+    db: Session,
+    excel_file: Path,
+    limit: int = None,
+    auto_confirm: bool = False,
+    feature_sample_rate: float = 1.0,
+    batch_size: int = BULK_IMPORT_CHUNK_SIZE
+):
     """
     Importa dados da Mega-Sena do Excel.
     
@@ -52,11 +271,14 @@ def import_megasena(db: Session, excel_file: Path, limit: int = None, auto_confi
         db: Sessão do banco
         excel_file: Caminho do arquivo Excel
         limit: Limite de registros (None = todos)
+        auto_confirm: Confirmar sem perguntar
+        feature_sample_rate: Fração dos sorteios com features calculadas na importação
+        batch_size: Sorteios por INSERT em lote (e por commit)
     """
     print(f"📂 Lendo arquivo: {excel_file}")
     
-    # Ler Excel
-    df = pd.read_excel(excel_file)
+    # Ler Excel (apenas as colunas usadas)
+    df = read_draws_excel(excel_file, limit)
     print(f"   Encontradas {len(df)} linhas")
     
     # Verificar colunas esperadas
@@ -78,74 +300,7 @@ def import_megasena(db: Session, excel_file: Path, limit: int = None, auto_confi
     print(f"\n🎲 Importando para: {lottery.name} (ID: {lottery.id})")
     
     # Preparar dados
-    draws_data = []
-    
-    for idx, row in df.iterrows():
-        if limit and idx >= limit:
-            break
-        
-        # Número do concurso
-        contest_number = int(row['Concurso'])
-        
-        # Data do sorteio
-        draw_date = parse_date(row['Data do Sorteio'])
-        if not draw_date:
-            print(f"⚠️  Concurso {contest_number}: data inválida, pulando...")
-            continue
-        
-        # Números sorteados (colunas 3 a 8, ou nomes específicos)
-        numbers = []
-        
-        # Tentar por nome de coluna
-        for i in range(1, 7):
-            col_name = f'Bola{i}'
-            if col_name in row and not pd.isna(row[col_name]):
-                numbers.append(int(row[col_name]))
-        
-        # Se não encontrou por nome, tentar por posição (colunas 2-7)
-        if len(numbers) == 0:
-            try:
-                # Assumir que números estão nas colunas após Data do Sorteio
-                cols = df.columns.tolist()
-                data_idx = cols.index('Data do Sorteio')
-                for i in range(1, 7):
-                    col_idx = data_idx + i
-                    if col_idx < len(cols) and not pd.isna(row.iloc[col_idx]):
-                        numbers.append(int(row.iloc[col_idx]))
-            except:
-                pass
-        
-        # Validar números
-        if len(numbers) != 6:
-            print(f"⚠️  Concurso {contest_number}: esperados 6 números, encontrados {len(numbers)}, pulando...")
-            continue
-        
-        # Ordenar números
-        numbers.sort()
-        
-        # Valor do prêmio (se disponível)
-        prize_value = None
-        if 'Rateio 6 acertos' in row and not pd.isna(row['Rateio 6 acertos']):
-            try:
-                prize_value = float(row['Rateio 6 acertos'])
-            except:
-                pass
-        
-        # Quantidade de ganhadores (se disponível)
-        winners = None
-        if 'Ganhadores 6 acertos' in row and not pd.isna(row['Ganhadores 6 acertos']):
-            try:
-                winners = int(row['Ganhadores 6 acertos'])
-            except:
-                pass
-        
-        draws_data.append({
-            "contest_number": contest_number,
-            "draw_date": draw_date,
-            "numbers": numbers,
-            "prize_value": prize_value,
-            "winners": winners,
-        })
+    draws_data = build_draws_data(df)
     
     print(f"\n✅ Preparados {len(draws_data)} sorteios para importação")
     
@@ -174,7 +329,9 @@ def import_megasena(db: Session, excel_file: Path, limit: int = None, auto_confi
         db,
         lottery_id=lottery.id,
         draws_data=draws_data,
-        calculate_features=True
+        calculate_features=True,
+        feature_sample_rate=feature_sample_rate,
+        batch_size=batch_size
     )
     
     print(f"\n✅ Importação concluída!")
@@ -182,6 +339,93 @@ def import_megasena(db: Session, excel_file: Path, limit: int = None, auto_confi
     print(f"   Sorteios pulados (já existentes): {len(draws_data) - imported}")
 
 
+def import_megasena_streaming(
+    db: Session,
+    excel_file: Path,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    limit: int = None,
+    auto_confirm: bool = False,
+    feature_sample_rate: float = 1.0,
+    batch_size: int = BULK_IMPORT_CHUNK_SIZE
+):
+    """
+    Importa dados da Mega-Sena do Excel em blocos, sem carregar a planilha inteira.
+    
+    Cada bloco de `chunk_size` linhas é montado e enviado ao bulk_import
+    antes de ler o próximo, então a memória fica limitada ao bloco. Como o
+    total só é conhecido no fim, a confirmação é pedida antes da leitura.
+    
+    Args:
+        db: Sessão do banco
+        excel_file: Caminho do arquivo Excel
+        chunk_size: Linhas lidas por bloco
+        limit: Limite de registros (None = todos)
+        auto_confirm: Confirmar sem perguntar
+        feature_sample_rate: Fração dos sorteios com features calculadas na importação
+        batch_size: Sorteios por INSERT em lote (e por commit)
+    """
+    print(f"📂 Lendo arquivo em blocos de {chunk_size} linhas: {excel_file}")
+    
+    # Buscar loteria Mega-Sena
+    lottery = LotteryService.get_by_slug(db, "megasena")
+    if not lottery:
+        print("❌ Loteria 'megasena' não encontrada no banco")
+        return
+    
+    print(f"\n🎲 Importando para: {lottery.name} (ID: {lottery.id})")
+    
+    if not auto_confirm:
+        response = input(f"\n❓ Confirma importação em streaming de {excel_file.name}? (s/n): ")
+        if response.lower() != 's':
+            print("❌ Importação cancelada")
+            return
+    else:
+        print(f"\n✅ Auto-confirmado (--yes)")
+    
+    print(f"\n🚀 Iniciando importação...")
+    total = 0
+    imported = 0
+    for df in iter_draws_excel(excel_file, chunk_size, limit):
+        # Verificar colunas esperadas (o cabeçalho é o mesmo em todos os blocos)
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            print(f"❌ Coluna '{missing[0]}' não encontrada no arquivo")
+            return
+        
+        draws_data = build_draws_data(df)
+        total += len(draws_data)
+        imported += DrawService.bulk_import(
+            db,
+            lottery_id=lottery.id,
+            draws_data=draws_data,
+            calculate_features=True,
+            feature_sample_rate=feature_sample_rate,
+            batch_size=batch_size
+        )
+    
+    print(f"\n✅ Importação concluída!")
+    print(f"   Sorteios importados: {imported}")
+    print(f"   Sorteios pulados (já existentes): {total - imported}")
+
+
+def backfill_features(db: Session, batch_size: int = BULK_IMPORT_CHUNK_SIZE):
+    """
+    Grava as features dos sorteios importados sem elas (--feature-sample-rate < 1).
+    
+    Args:
+        db: Sessão do banco
+        batch_size: Sorteios por INSERT em lote e por commit
+    """
+    lottery = LotteryService.get_by_slug(db, "megasena")
+    if not lottery:
+        print("❌ Loteria 'megasena' não encontrada no banco")
+        return
+    
+    print(f"\n🧮 Calculando features pendentes de: {lottery.name} (ID: {lottery.id})")
+    filled = DrawService.backfill_features(db, lottery.id, batch_size=batch_size)
+    print(f"\n✅ Features gravadas para {filled} sorteios")
+
+
 def main():
     """Entry point."""
     import argparse
@@ -204,8 +448,41 @@ def main():
         action="store_true",
         help="Confirmar automaticamente sem perguntar"
     )
+    parser.add_argument(
+        "--feature-sample-rate",
+        type=float,
+        default=1.0,
+        help="Fração (0 a 1) dos sorteios com features na importação; o resto é calculado sob demanda"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BULK_IMPORT_CHUNK_SIZE,
+        help=f"Sorteios por INSERT em lote e por commit (padrão: {BULK_IMPORT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help=f"Ler o Excel em blocos deste tamanho, sem carregar a planilha inteira (ex.: {STREAM_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--backfill-features",
+        action="store_true",
+        help="Não importa: grava as features dos sorteios que ficaram sem elas"
+    )
     
     args = parser.parse_args()
+    if not 0 <= args.feature_sample_rate <= 1:
+        parser.error("--feature-sample-rate deve estar entre 0 e 1")
+    
+    if args.backfill_features:
+        db = SessionLocal()
+        try:
+            backfill_features(db, batch_size=args.batch_size)
+        finally:
+            db.close()
+        return
     
     # Resolver caminho do arquivo
     excel_file = Path(__file__).parent / args.file
@@ -217,7 +494,25 @@ def main():
     db = SessionLocal()
     
     try:
-        import_megasena(db, excel_file, limit=args.limit, auto_confirm=args.yes)
+        if args.chunk_size:
+            import_megasena_streaming(
+                db,
+                excel_file,
+                chunk_size=args.chunk_size,
+                limit=args.limit,
+                auto_confirm=args.yes,
+                feature_sample_rate=args.feature_sample_rate,
+                batch_size=args.batch_size
+            )
+        else:
+            import_megasena(
+                db,
+                excel_file,
+                limit=args.limit,
+                auto_confirm=args.yes,
+                feature_sample_rate=args.feature_sample_rate,
+                batch_size=args.batch_size
+            )
     except Exception as e:
         print(f"\n❌ Erro durante importação: {e}")
         import traceback
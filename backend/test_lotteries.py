@@ -92,6 +92,30 @@ def test_neighbors():
     print(f"Vizinhos (8-conectados): {sorted(neighbors_8)}")
 
 
+def test_nearest_neighbor():
+    """Testa a feature mean_nearest_neighbor contra o cálculo ponto a ponto."""
+    print("\n" + "=" * 60)
+    print("📏 VIZINHO MAIS PRÓXIMO")
+    print("=" * 60)
+    
+    for lottery, numbers in [
+        (megasena, [1, 2, 23, 38, 45, 60]),
+        (lotofacil, [1, 2, 3, 5, 7, 8, 11, 13, 14, 17, 19, 20, 22, 24, 25]),
+    ]:
+        positions = [lottery.num_to_pos(n) for n in numbers]
+        expected = sum(
+            min(
+                ((r1 - r2) ** 2 + (c1 - c2) ** 2) ** 0.5
+                for j, (r2, c2) in enumerate(positions) if j != i
+            )
+            for i, (r1, c1) in enumerate(positions)
+        ) / len(positions)
+        
+        value = lottery.calculate_features(numbers).mean_nearest_neighbor
+        assert abs(value - expected) < 1e-9, f"{lottery.slug}: {value} != {expected}"
+        print(f"  {lottery.name}: {value:.4f} ✅")
+
+
 def test_registry():
     """Testa registry de loterias."""
     print("\n" + "=" * 60)
@@ -111,6 +135,7 @@ if __name__ == "__main__":
     test_megasena()
     test_lotofacil()
     test_neighbors()
+    test_nearest_neighbor()
     test_registry()
     
     print("\n" + "=" * 60)
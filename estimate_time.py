@@ -15,9 +15,8 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from src.monte_carlo import simulate_monte_carlo
 from src.ingest import ingest_raw_data
 from src.features import build_features_dataset
-from src.features_advanced import extract_advanced_features
+from src.features_advanced import extract_advanced_features_batch
 from src.validation import validate_features
-import pandas as pd
 
 
 def format_time(seconds: float) -> str:
@@ -124,17 +123,12 @@ def estimate_monte_carlo_time(
         try:
             # Gera features observadas (pequena amostra)
             print("Gerando features observadas...")
-            features_df = build_features_dataset(df.head(100))
+            sample_df = df.head(100)
+            features_df = build_features_dataset(sample_df)
             
-            advanced_list = []
-            for _, row in df.head(100).iterrows():
-                numbers = [row[f"bola_{i}"] for i in range(1, 7)]
-                advanced = extract_advanced_features(numbers)
-                advanced["concurso"] = row["concurso"]
-                advanced_list.append(advanced)
-            
-            advanced_df = pd.DataFrame(advanced_list)
-            features_df = features_df.merge(advanced_df, on="concurso")
+            # Features avançadas em lote, na mesma ordem das linhas da amostra
+            sample_numbers = sample_df[[f"bola_{i}" for i in range(1, 7)]].to_numpy()
+            features_df = features_df.assign(**extract_advanced_features_batch(sample_numbers))
             
             # Simula para validação
             print("Simulando para validação...")
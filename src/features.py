@@ -4,19 +4,33 @@ Módulo para extração de features espaciais dos sorteios da Mega-Sena.
 Gera features baseadas na distribuição espacial dos números no volante 10x6.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 from .spatial import (
+    NUM_TO_POS,
+    NUM_TO_QUADRANT,
     nums_to_positions,
-    nums_to_binary_vector,
+    nums_to_bitmap,
     get_quadrant,
     is_border,
     is_corner
 )
 
+# Opções de escrita do Parquet de features
+PARQUET_ZSTD_LEVEL = 3
+PARQUET_ROW_GROUP_SIZE = 50_000
+
+# Sorteios mínimos por worker em extract_features_parallel
+PARALLEL_MIN_CHUNK = 100_000
+
+# Quadrante por número como tupla (consulta por sorteio sem NumPy)
+_NUM_QUADRANT = tuple(NUM_TO_QUADRANT.tolist())
+
 
 def compute_centroid(positions: List[Tuple[int, int]]) -> Tuple[float, float]:
     """
@@ -44,22 +58,40 @@ def compute_dispersion(positions: List[Tuple[int, int]]) -> float:
     Returns:
         Distância Manhattan média entre todos os pares
     """
-    n = len(positions)
-    if n <= 1:
+    if len(positions) <= 1:
         return 0.0
     
-    total_distance = 0.0
-    count = 0
+    coords = np.array(positions)
+    return float(_mean_pairwise_manhattan(coords[:, 0], coords[:, 1]))
+
+
+def _mean_pairwise_manhattan(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    presorted: bool = False
+) -> np.ndarray:
+    """
+    Distância Manhattan média entre todos os pares, sem laço sobre pares.
     
-    for i in range(n):
-        for j in range(i + 1, n):
-            r1, c1 = positions[i]
-            r2, c2 = positions[j]
-            distance = abs(r1 - r2) + abs(c1 - c2)
-            total_distance += distance
-            count += 1
+    Para x ordenado, sum_{i<j} |x_i - x_j| = sum_i (2i - n + 1) * x_i,
+    então cada eixo custa uma ordenação e um produto escalar.
     
-    return total_distance / count if count > 0 else 0.0
+    Args:
+        rows: Linhas, shape (..., n) com n >= 2
+        cols: Colunas, mesmo shape
+        presorted: Se True, rows e cols já estão ordenados no último eixo
+    
+    Returns:
+        Média por sorteio, shape (...)
+    """
+    if not presorted:
+        rows = np.sort(rows, axis=-1)
+        cols = np.sort(cols, axis=-1)
+    
+    n = rows.shape[-1]
+    weights = 2 * np.arange(n) - (n - 1)
+    total = (rows @ weights) + (cols @ weights)
+    return total / (n * (n - 1) // 2)
 
 
 def compute_quadrant_counts(positions: List[Tuple[int, int]]) -> Dict[str, int]:
@@ -72,13 +104,13 @@ def compute_quadrant_counts(positions: List[Tuple[int, int]]) -> Dict[str, int]:
     Returns:
         Dicionário com contagens por quadrante (q1, q2, q3, q4)
     """
-    counts = {"q1": 0, "q2": 0, "q3": 0, "q4": 0}
+    counts = [0, 0, 0, 0]
+    quadrant = get_quadrant  # local: evita busca global a cada posição
     
     for row, col in positions:
-        quad = get_quadrant(row, col)
-        counts[f"q{quad + 1}"] += 1
+        counts[quadrant(row, col)] += 1
     
-    return counts
+    return {"q1": counts[0], "q2": counts[1], "q3": counts[2], "q4": counts[3]}
 
 
 def compute_border_count(positions: List[Tuple[int, int]]) -> int:
@@ -91,7 +123,8 @@ def compute_border_count(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de posições na borda
     """
-    return sum(1 for row, col in positions if is_border(row, col))
+    border = is_border
+    return sum(1 for row, col in positions if border(row, col))
 
 
 def compute_corner_count(positions: List[Tuple[int, int]]) -> int:
@@ -104,7 +137,8 @@ def compute_corner_count(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de posições nos cantos
     """
-    return sum(1 for row, col in positions if is_corner(row, col))
+    corner = is_corner
+    return sum(1 for row, col in positions if corner(row, col))
 
 
 def compute_row_col_distribution(positions: List[Tuple[int, int]]) -> Dict[str, float]:
@@ -149,8 +183,11 @@ def extract_features_for_draw(numbers: List[int]) -> Dict[str, float]:
     # Dispersão
     dispersion = compute_dispersion(positions)
     
-    # Quadrantes
-    quadrant_counts = compute_quadrant_counts(positions)
+    # Quadrantes (tabela por número; positions já validou os números)
+    counts = [0, 0, 0, 0]
+    for num in numbers:
+        counts[_NUM_QUADRANT[num]] += 1
+    quadrant_counts = {"q1": counts[0], "q2": counts[1], "q3": counts[2], "q4": counts[3]}
     
     # Borda e cantos
     border_count = compute_border_count(positions)
@@ -173,42 +210,117 @@ def extract_features_for_draw(numbers: List[int]) -> Dict[str, float]:
     return features
 
 
-def build_features_dataset(df: pd.DataFrame) -> pd.DataFrame:
+def extract_features_batch(nums: np.ndarray) -> Dict[str, np.ndarray]:
     """
-    Constrói dataset completo de features para todos os concursos.
+    Extrai as features de extract_features_for_draw para vários sorteios.
+    
+    Cada feature é uma operação NumPy sobre o eixo das bolas, sem laço
+    por sorteio; os valores são idênticos aos da versão por sorteio.
     
     Args:
-        df: DataFrame com colunas concurso, data, bola_1, ..., bola_6
+        nums: Array (n_sorteios, 6) com números entre 1 e 60
         
     Returns:
-        DataFrame com features espaciais para cada concurso
+        Dicionário feature -> array (n_sorteios,), na ordem de extract_features_for_draw
+    
+    Raises:
+        ValueError: Se algum número não estiver entre 1 e 60
     """
-    features_list = []
+    nums = np.asarray(nums, dtype=np.int64)
     
-    for idx, row in df.iterrows():
-        # Extrai números do sorteio
-        numbers = [row[f"bola_{i}"] for i in range(1, 7)]
-        
-        # Extrai features
-        features = extract_features_for_draw(numbers)
-        
-        # Adiciona metadados
-        features["concurso"] = row["concurso"]
-        features["data"] = row["data"]
-        
-        features_list.append(features)
+    invalid = (nums < 1) | (nums > 60)
+    if invalid.any():
+        raise ValueError(f"Número deve estar entre 1 e 60, recebido: {nums[invalid][0]}")
+    
+    # Posições no volante via tabela (mesmo mapeamento de num_to_pos)
+    positions = NUM_TO_POS[nums]
+    rows = positions[..., 0]
+    cols = positions[..., 1]
+    
+    # Borda e cantos
+    top_bottom = (rows == 0) | (rows == 9)
+    left_right = (cols == 0) | (cols == 5)
+    
+    # Quadrantes (mesma numeração de get_quadrant)
+    quadrant = NUM_TO_QUADRANT[nums]
+    
+    # Uma ordenação por eixo serve à dispersão e aos mínimos/máximos
+    sorted_rows = np.sort(rows, axis=1)
+    sorted_cols = np.sort(cols, axis=1)
+    
+    return {
+        "centroid_row": rows.mean(axis=1),
+        "centroid_col": cols.mean(axis=1),
+        "dispersion": _mean_pairwise_manhattan(sorted_rows, sorted_cols, presorted=True),
+        "border_count": (top_bottom | left_right).sum(axis=1),
+        "corner_count": (top_bottom & left_right).sum(axis=1),
+        "q1": (quadrant == 0).sum(axis=1),
+        "q2": (quadrant == 1).sum(axis=1),
+        "q3": (quadrant == 2).sum(axis=1),
+        "q4": (quadrant == 3).sum(axis=1),
+        "row_std": rows.std(axis=1),
+        "col_std": cols.std(axis=1),
+        "row_min": sorted_rows[:, 0],
+        "row_max": sorted_rows[:, -1],
+        "col_min": sorted_cols[:, 0],
+        "col_max": sorted_cols[:, -1],
+    }
+
+
+def extract_features_parallel(
+    nums: np.ndarray,
+    n_jobs: int = -1,
+    min_chunk: int = PARALLEL_MIN_CHUNK
+) -> Dict[str, np.ndarray]:
+    """
+    extract_features_batch dividido em blocos de sorteios processados em paralelo.
+    
+    Usa threads: as operações NumPy liberam o GIL e os blocos não precisam
+    ser serializados para outro processo. Com poucos sorteios (menos de
+    `min_chunk` por worker) roda em série.
+    
+    Args:
+        nums: Array (n_sorteios, 6) com números entre 1 e 60
+        n_jobs: Número de workers (-1 = todos os núcleos)
+        min_chunk: Tamanho mínimo de bloco por worker
+    
+    Returns:
+        Mesmo resultado de extract_features_batch(nums)
+    """
+    workers = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+    n_chunks = min(workers, len(nums) // min_chunk)
+    if n_chunks <= 1:
+        return extract_features_batch(nums)
+    
+    with ThreadPoolExecutor(max_workers=n_chunks) as pool:
+        parts = list(pool.map(extract_features_batch, np.array_split(nums, n_chunks)))
+    
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def build_features_dataset(df: pd.DataFrame, n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Constrói dataset completo de features para todos os concursos.
     
-    # Cria DataFrame
-    features_df = pd.DataFrame(features_list)
+    Os números viram um array (n_concursos, 6) e as features são
+    calculadas por colunas (extract_features_batch), sem iterar linha a linha.
     
-    # Reordena colunas
-    cols = ["concurso", "data"] + [
-        col for col in features_df.columns
-        if col not in ["concurso", "data"]
-    ]
-    features_df = features_df[cols]
+    Args:
+        df: DataFrame com colunas concurso, data, bola_1, ..., bola_6
+        n_jobs: Workers para blocos de concursos (1 = em série, -1 = todos os núcleos)
     
-    print(f"✓ Features extraídas: {len(features_df)} concursos, {len(cols)-2} features")
+    Returns:
+        DataFrame com features espaciais para cada concurso
+    """
+    nums = df[[f"bola_{i}" for i in range(1, 7)]].to_numpy(dtype=np.int64)
+    
+    features_df = pd.DataFrame({
+        "concurso": df["concurso"].to_numpy(),
+        "data": df["data"].to_numpy(),
+        **extract_features_parallel(nums, n_jobs),
+    })
+    
+    print(f"✓ Features extraídas: {len(features_df)} concursos, {features_df.shape[1]-2} features")
     
     return features_df
 
@@ -217,24 +329,22 @@ def build_vectors_dataset(df: pd.DataFrame) -> np.ndarray:
     """
     Constrói dataset de vetores binários para todos os concursos.
     
+    Cada concurso vira um bitmap uint64 (bit num - 1 ligado se o número
+    saiu). Use bitmaps_to_vectors para a matriz (n_concursos, 60) e
+    count_common_numbers para números em comum entre concursos.
+    
     Args:
         df: DataFrame com colunas concurso, data, bola_1, ..., bola_6
         
     Returns:
-        Array numpy com shape (n_concursos, 60)
+        Array numpy uint64 com shape (n_concursos,)
     """
-    vectors = []
+    nums = df[[f"bola_{i}" for i in range(1, 7)]].to_numpy()
+    bitmaps = nums_to_bitmap(nums)
     
-    for idx, row in df.iterrows():
-        numbers = [row[f"bola_{i}"] for i in range(1, 7)]
-        vector = nums_to_binary_vector(numbers)
-        vectors.append(vector)
+    print(f"✓ Vetores criados: {len(bitmaps)} bitmaps de 60 bits")
     
-    vectors_array = np.array(vectors, dtype=np.int8)
-    
-    print(f"✓ Vetores criados: shape {vectors_array.shape}")
-    
-    return vectors_array
+    return bitmaps
 
 
 def save_features(
@@ -249,7 +359,7 @@ def save_features(
     
     Args:
         features_df: DataFrame com features
-        vectors: Array numpy com vetores binários
+        vectors: Bitmaps uint64 de build_vectors_dataset
         df_original: DataFrame original com concursos
         features_path: Caminho para salvar features
         vectors_path: Caminho para salvar vetores
@@ -258,15 +368,24 @@ def save_features(
     Path(features_path).parent.mkdir(parents=True, exist_ok=True)
     Path(vectors_path).parent.mkdir(parents=True, exist_ok=True)
     
-    # Salva features em Parquet
-    features_df.to_parquet(features_path, index=False)
+    # Salva features em Parquet (pyarrow, dicionário + ZSTD: colunas de
+    # contagens e posições repetem poucos valores)
+    features_df.to_parquet(
+        features_path,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=PARQUET_ZSTD_LEVEL,
+        use_dictionary=True,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        index=False
+    )
     print(f"✓ Features salvas em: {features_path}")
     
     # Salva vetores e metadados em NPZ
     concursos = df_original["concurso"].values
     np.savez_compressed(
         vectors_path,
-        vectors=vectors,
+        bitmaps=vectors,
         concursos=concursos
     )
     print(f"✓ Vetores salvos em: {vectors_path}")
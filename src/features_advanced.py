@@ -5,13 +5,127 @@ Implementa features de conectividade, simetria, adjacência e geometria.
 """
 
 from typing import List, Tuple, Dict, Set
+import math
 import numpy as np
-from collections import deque
 
-from .spatial import nums_to_positions, get_quadrant
+from .spatial import NUM_TO_POS, nums_to_positions, get_quadrant
 
 
-def get_neighbors_4(row: int, col: int) -> List[Tuple[int, int]]:
+# Máscara de bits do volante: a posição (row, col) é o bit row * 6 + col.
+# Vizinhos viram deslocamentos: +1 (direita), +6 (abaixo), +7 e +5
+# (diagonais); as máscaras de coluna evitam pular de uma linha para a outra.
+NOT_LAST_COL = sum(1 << (r * 6 + c) for r in range(10) for c in range(5))
+NOT_FIRST_COL = sum(1 << (r * 6 + c) for r in range(10) for c in range(1, 6))
+
+# Bit de cada número (índice = número; 0 não usado)
+_NUM_BITS = (0,) + tuple(1 << int(row * 6 + col) for row, col in NUM_TO_POS[1:])
+
+# Tabelas por número (índice = número; 0 não usado): anel (1-3, mesmo critério
+# de compute_ring_distribution) e metade do volante para as simetrias
+_distance_sq = (NUM_TO_POS[:, 0] - 4.5) ** 2 + (NUM_TO_POS[:, 1] - 2.5) ** 2
+NUM_TO_RING = np.where(_distance_sq <= 4, 1, np.where(_distance_sq <= 16, 2, 3)).astype(np.int8)
+NUM_TO_RING[0] = 0
+NUM_IN_UPPER = (NUM_TO_POS[:, 0] < 4.5).astype(np.int8)
+NUM_IN_LEFT = (NUM_TO_POS[:, 1] < 2.5).astype(np.int8)
+NUM_IN_UPPER[0] = NUM_IN_LEFT[0] = 0
+
+_NUM_RING = tuple(NUM_TO_RING.tolist())
+_NUM_UPPER = tuple(NUM_IN_UPPER.tolist())
+_NUM_LEFT = tuple(NUM_IN_LEFT.tolist())
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+def positions_to_mask(positions: List[Tuple[int, int]]) -> int:
+    """
+    Converte posições em máscara de bits (bit row * 6 + col).
+    
+    Args:
+        positions: Lista de tuplas (row, col)
+    
+    Returns:
+        Inteiro com um bit ligado por posição
+    """
+    mask = 0
+    for row, col in positions:
+        mask |= 1 << (row * 6 + col)
+    return mask
+
+
+def _adjacencies_4_mask(mask: int) -> int:
+    """Pares 4-conectados: horizontais (deslocamento 1) e verticais (6)."""
+    return _popcount(mask & (mask >> 1) & NOT_LAST_COL) + _popcount(mask & (mask >> 6))
+
+
+def _grow_4(cells: int) -> int:
+    """Células mais seus vizinhos 4-conectados (pode passar do bit 59)."""
+    return (
+        cells
+        | ((cells << 1) & NOT_FIRST_COL) | ((cells >> 1) & NOT_LAST_COL)
+        | (cells << 6) | (cells >> 6)
+    )
+
+
+def _grow_8(cells: int) -> int:
+    """Células mais seus vizinhos 8-conectados (pode passar do bit 59)."""
+    return (
+        _grow_4(cells)
+        | ((cells << 7) & NOT_FIRST_COL) | ((cells >> 7) & NOT_LAST_COL)
+        | ((cells << 5) & NOT_LAST_COL) | ((cells >> 5) & NOT_FIRST_COL)
+    )
+
+
+def _components_mask(mask: int, grow) -> int:
+    """
+    Conta componentes conexas de uma máscara por preenchimento com bits.
+    
+    Parte do menor bit ligado e expande a componente inteira de uma vez
+    (grow & mask) até estabilizar; repete com os bits restantes.
+    """
+    components = 0
+    while mask:
+        component = mask & -mask
+        while True:
+            expanded = grow(component) & mask
+            if expanded == component:
+                break
+            component = expanded
+        mask &= ~component
+        components += 1
+    return components
+
+
+def _adjacencies_8_mask(mask: int) -> int:
+    """Pares 8-conectados: os 4-conectados mais as diagonais (7 e 5)."""
+    return (
+        _adjacencies_4_mask(mask)
+        + _popcount(mask & (mask >> 7) & NOT_LAST_COL)
+        + _popcount(mask & (mask >> 5) & NOT_FIRST_COL)
+    )
+
+
+def _neighbors_in_grid(row: int, col: int, offsets) -> Tuple[Tuple[int, int], ...]:
+    """Vizinhos de (row, col) pelos deslocamentos dados, dentro do volante 10x6."""
+    return tuple(
+        (row + dr, col + dc) for dr, dc in offsets
+        if 0 <= row + dr <= 9 and 0 <= col + dc <= 5
+    )
+
+
+# Deslocamentos de vizinhança (Von Neumann e Moore)
+OFFSETS_4 = ((-1, 0), (1, 0), (0, -1), (0, 1))
+OFFSETS_8 = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0))
+
+# Vizinhos de cada posição, indexados por row * 6 + col (calculados uma vez)
+NEIGHBORS_4 = tuple(_neighbors_in_grid(r, c, OFFSETS_4) for r in range(10) for c in range(6))
+NEIGHBORS_8 = tuple(_neighbors_in_grid(r, c, OFFSETS_8) for r in range(10) for c in range(6))
+
+
+def get_neighbors_4(row: int, col: int) -> Tuple[Tuple[int, int], ...]:
     """
     Retorna vizinhos 4-conectados (Von Neumann) de uma posição.
     
@@ -20,17 +134,14 @@ def get_neighbors_4(row: int, col: int) -> List[Tuple[int, int]]:
         col: Coluna (0-5)
         
     Returns:
-        Lista de tuplas (row, col) dos vizinhos válidos
+        Tupla (pré-calculada) de tuplas (row, col) dos vizinhos válidos
     """
-    neighbors = []
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        r, c = row + dr, col + dc
-        if 0 <= r <= 9 and 0 <= c <= 5:
-            neighbors.append((r, c))
-    return neighbors
+    if 0 <= row <= 9 and 0 <= col <= 5:
+        return NEIGHBORS_4[row * 6 + col]
+    return _neighbors_in_grid(row, col, OFFSETS_4)
 
 
-def get_neighbors_8(row: int, col: int) -> List[Tuple[int, int]]:
+def get_neighbors_8(row: int, col: int) -> Tuple[Tuple[int, int], ...]:
     """
     Retorna vizinhos 8-conectados (Moore) de uma posição.
     
@@ -39,17 +150,11 @@ def get_neighbors_8(row: int, col: int) -> List[Tuple[int, int]]:
         col: Coluna (0-5)
         
     Returns:
-        Lista de tuplas (row, col) dos vizinhos válidos
+        Tupla (pré-calculada) de tuplas (row, col) dos vizinhos válidos
     """
-    neighbors = []
-    for dr in [-1, 0, 1]:
-        for dc in [-1, 0, 1]:
-            if dr == 0 and dc == 0:
-                continue
-            r, c = row + dr, col + dc
-            if 0 <= r <= 9 and 0 <= c <= 5:
-                neighbors.append((r, c))
-    return neighbors
+    if 0 <= row <= 9 and 0 <= col <= 5:
+        return NEIGHBORS_8[row * 6 + col]
+    return _neighbors_in_grid(row, col, OFFSETS_8)
 
 
 def count_adjacencies_4(positions: List[Tuple[int, int]]) -> int:
@@ -62,17 +167,7 @@ def count_adjacencies_4(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de pares adjacentes
     """
-    pos_set = set(positions)
-    count = 0
-    
-    for row, col in positions:
-        neighbors = get_neighbors_4(row, col)
-        for n_row, n_col in neighbors:
-            if (n_row, n_col) in pos_set:
-                count += 1
-    
-    # Divide por 2 porque cada par foi contado duas vezes
-    return count // 2
+    return _adjacencies_4_mask(positions_to_mask(positions))
 
 
 def count_adjacencies_8(positions: List[Tuple[int, int]]) -> int:
@@ -85,16 +180,7 @@ def count_adjacencies_8(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de pares adjacentes
     """
-    pos_set = set(positions)
-    count = 0
-    
-    for row, col in positions:
-        neighbors = get_neighbors_8(row, col)
-        for n_row, n_col in neighbors:
-            if (n_row, n_col) in pos_set:
-                count += 1
-    
-    return count // 2
+    return _adjacencies_8_mask(positions_to_mask(positions))
 
 
 def compute_connected_components_4(positions: List[Tuple[int, int]]) -> int:
@@ -107,33 +193,7 @@ def compute_connected_components_4(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de componentes conexas (1-6)
     """
-    if not positions:
-        return 0
-    
-    pos_set = set(positions)
-    visited = set()
-    components = 0
-    
-    for start_pos in positions:
-        if start_pos in visited:
-            continue
-        
-        # BFS para explorar componente
-        queue = deque([start_pos])
-        visited.add(start_pos)
-        components += 1
-        
-        while queue:
-            row, col = queue.popleft()
-            neighbors = get_neighbors_4(row, col)
-            
-            for n_row, n_col in neighbors:
-                neighbor = (n_row, n_col)
-                if neighbor in pos_set and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-    
-    return components
+    return _components_mask(positions_to_mask(positions), _grow_4)
 
 
 def compute_connected_components_8(positions: List[Tuple[int, int]]) -> int:
@@ -146,32 +206,7 @@ def compute_connected_components_8(positions: List[Tuple[int, int]]) -> int:
     Returns:
         Número de componentes conexas (1-6)
     """
-    if not positions:
-        return 0
-    
-    pos_set = set(positions)
-    visited = set()
-    components = 0
-    
-    for start_pos in positions:
-        if start_pos in visited:
-            continue
-        
-        queue = deque([start_pos])
-        visited.add(start_pos)
-        components += 1
-        
-        while queue:
-            row, col = queue.popleft()
-            neighbors = get_neighbors_8(row, col)
-            
-            for n_row, n_col in neighbors:
-                neighbor = (n_row, n_col)
-                if neighbor in pos_set and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-    
-    return components
+    return _components_mask(positions_to_mask(positions), _grow_8)
 
 
 def compute_inertia(positions: List[Tuple[int, int]]) -> float:
@@ -187,8 +222,7 @@ def compute_inertia(positions: List[Tuple[int, int]]) -> float:
     if not positions:
         return 0.0
     
-    rows = [pos[0] for pos in positions]
-    cols = [pos[1] for pos in positions]
+    rows, cols = zip(*positions)
     
     mean_row = np.mean(rows)
     mean_col = np.mean(cols)
@@ -214,8 +248,7 @@ def compute_eccentricity(positions: List[Tuple[int, int]]) -> float:
     if len(positions) <= 1:
         return 1.0
     
-    rows = [pos[0] for pos in positions]
-    cols = [pos[1] for pos in positions]
+    rows, cols = zip(*positions)
     
     std_row = np.std(rows)
     std_col = np.std(cols)
@@ -238,18 +271,17 @@ def compute_symmetry(positions: List[Tuple[int, int]]) -> Dict[str, int]:
     Returns:
         Dicionário com simetrias vertical e horizontal
     """
-    rows = [pos[0] for pos in positions]
-    cols = [pos[1] for pos in positions]
+    # Uma passada conta as metades superior e esquerda; as outras são o resto
+    upper = left = 0
+    for row, col in positions:
+        upper += row < 4.5
+        left += col < 2.5
     
     # Simetria horizontal (divide em row < 4.5 e row >= 4.5)
-    upper = sum(1 for r in rows if r < 4.5)
-    lower = sum(1 for r in rows if r >= 4.5)
-    sym_horizontal = abs(upper - lower)
+    sym_horizontal = abs(upper - (len(positions) - upper))
     
     # Simetria vertical (divide em col < 2.5 e col >= 2.5)
-    left = sum(1 for c in cols if c < 2.5)
-    right = sum(1 for c in cols if c >= 2.5)
-    sym_vertical = abs(left - right)
+    sym_vertical = abs(left - (len(positions) - left))
     
     return {
         "symmetry_horizontal": sym_horizontal,
@@ -266,6 +298,8 @@ def compute_ring_distribution(positions: List[Tuple[int, int]]) -> Dict[str, int
     Ring2: 2 < distância <= 4
     Ring3: distância > 4
     
+    Compara o quadrado da distância com 4 e 16, sem calcular a raiz.
+    
     Args:
         positions: Lista de tuplas (row, col)
         
@@ -277,11 +311,11 @@ def compute_ring_distribution(positions: List[Tuple[int, int]]) -> Dict[str, int
     rings = {"ring1": 0, "ring2": 0, "ring3": 0}
     
     for row, col in positions:
-        distance = np.sqrt((row - center_row)**2 + (col - center_col)**2)
+        distance_sq = (row - center_row)**2 + (col - center_col)**2
         
-        if distance <= 2:
+        if distance_sq <= 4:
             rings["ring1"] += 1
-        elif distance <= 4:
+        elif distance_sq <= 16:
             rings["ring2"] += 1
         else:
             rings["ring3"] += 1
@@ -304,8 +338,8 @@ def compute_compactness(positions: List[Tuple[int, int]]) -> float:
     if not positions:
         return 0.0
     
-    rows = [pos[0] for pos in positions]
-    cols = [pos[1] for pos in positions]
+    # Linhas e colunas separadas numa única transposição
+    rows, cols = zip(*positions)
     
     min_row, max_row = min(rows), max(rows)
     min_col, max_col = min(cols), max(cols)
@@ -335,25 +369,59 @@ def extract_advanced_features(numbers: List[int]) -> Dict[str, float]:
         Dicionário com features avançadas
     """
     positions = nums_to_positions(numbers)
+    if not positions:
+        return {
+            "adjacencies_4": 0,
+            "adjacencies_8": 0,
+            "connectivity_4": 0,
+            "connectivity_8": 0,
+            "inertia": compute_inertia(positions),
+            "eccentricity": compute_eccentricity(positions),
+            "compactness": compute_compactness(positions),
+            **compute_symmetry(positions),
+            **compute_ring_distribution(positions)
+        }
+    
+    # Máscara de bits calculada uma vez para adjacências e conectividade
+    mask = 0
+    for num in numbers:
+        mask |= _NUM_BITS[num]
     
     # Adjacências
-    adj_4 = count_adjacencies_4(positions)
-    adj_8 = count_adjacencies_8(positions)
+    adj_4 = _adjacencies_4_mask(mask)
+    adj_8 = _adjacencies_8_mask(mask)
     
     # Conectividade
-    conn_4 = compute_connected_components_4(positions)
-    conn_8 = compute_connected_components_8(positions)
-    
-    # Geometria
-    inertia = compute_inertia(positions)
-    eccentricity = compute_eccentricity(positions)
-    compactness = compute_compactness(positions)
-    
-    # Simetria
-    symmetry = compute_symmetry(positions)
-    
-    # Anéis
-    rings = compute_ring_distribution(positions)
+    conn_4 = _components_mask(mask, _grow_4)
+    conn_8 = _components_mask(mask, _grow_8)
+    
+    # Geometria: linhas, colunas e médias calculadas uma única vez e usadas
+    # pelas mesmas fórmulas de compute_inertia/eccentricity/compactness
+    k = len(positions)
+    rows = [row for row, _ in positions]
+    cols = [col for _, col in positions]
+    mean_row = sum(rows) / k
+    mean_col = sum(cols) / k
+    dev_row = [(row - mean_row) ** 2 for row in rows]
+    dev_col = [(col - mean_col) ** 2 for col in cols]
+    
+    inertia = sum(dr + dc for dr, dc in zip(dev_row, dev_col))
+    
+    std_row = math.sqrt(sum(dev_row) / k)
+    std_col = math.sqrt(sum(dev_col) / k)
+    eccentricity = std_row / std_col if std_row != 0 and std_col != 0 else 1.0
+    
+    height = max(rows) - min(rows) + 1
+    width = max(cols) - min(cols) + 1
+    compactness = k / (2 * (height + width))
+    
+    # Simetria e anéis por tabela
+    upper = left = 0
+    ring_counts = [0, 0, 0, 0]
+    for num in numbers:
+        upper += _NUM_UPPER[num]
+        left += _NUM_LEFT[num]
+        ring_counts[_NUM_RING[num]] += 1
     
     # Combina tudo
     features = {
@@ -364,8 +432,129 @@ def extract_advanced_features(numbers: List[int]) -> Dict[str, float]:
         "inertia": inertia,
         "eccentricity": eccentricity,
         "compactness": compactness,
-        **symmetry,
-        **rings
+        "symmetry_horizontal": abs(2 * upper - k),
+        "symmetry_vertical": abs(2 * left - k),
+        "ring1": ring_counts[1],
+        "ring2": ring_counts[2],
+        "ring3": ring_counts[3]
     }
     
     return features
+
+
+# Colunas de extract_advanced_features e seus tipos, na mesma ordem
+ADVANCED_FEATURE_DTYPES = {
+    "adjacencies_4": np.int64,
+    "adjacencies_8": np.int64,
+    "connectivity_4": np.int64,
+    "connectivity_8": np.int64,
+    "inertia": np.float64,
+    "eccentricity": np.float64,
+    "compactness": np.float64,
+    "symmetry_horizontal": np.int64,
+    "symmetry_vertical": np.int64,
+    "ring1": np.int64,
+    "ring2": np.int64,
+    "ring3": np.int64,
+}
+
+
+def _count_components(adjacent: np.ndarray) -> np.ndarray:
+    """
+    Componentes conexas por sorteio a partir da matriz de adjacência.
+    
+    Fecho transitivo por quadrados sucessivos (ceil(log2 k) produtos de
+    matrizes booleanas); cada componente é contada pelo seu menor índice.
+    
+    Args:
+        adjacent: Array booleano (n, k, k), simétrico
+    
+    Returns:
+        Array int64 (n,) com o número de componentes
+    """
+    k = adjacent.shape[-1]
+    reach = adjacent | np.eye(k, dtype=bool)
+    steps = 1
+    while steps < k - 1:
+        reach = np.matmul(reach.astype(np.int8), reach.astype(np.int8)) > 0
+        steps *= 2
+    
+    # Nó i inicia uma componente se não alcança nenhum nó de índice menor
+    lower = np.tril(np.ones((k, k), dtype=bool), -1)
+    return (~(reach & lower).any(axis=2)).sum(axis=1).astype(np.int64)
+
+
+def extract_advanced_features_batch(draws) -> Dict[str, np.ndarray]:
+    """
+    Extrai as features avançadas de vários sorteios em colunas tipadas.
+    
+    Todas as features são operações NumPy sobre o array (n, 6) de posições,
+    sem laço por sorteio; os valores são idênticos aos de
+    extract_advanced_features.
+    
+    Args:
+        draws: Sequência (ou array (n, 6)) de sorteios
+    
+    Returns:
+        Dicionário feature -> array (n_sorteios,), na ordem de extract_advanced_features
+    
+    Raises:
+        ValueError: Se algum número não estiver entre 1 e 60
+    """
+    nums = np.asarray(draws, dtype=np.int64)
+    nums = nums.reshape(len(nums), -1) if nums.size else nums.reshape(0, 6)
+    
+    invalid = (nums < 1) | (nums > 60)
+    if invalid.any():
+        raise ValueError(f"Número deve estar entre 1 e 60, recebido: {nums[invalid][0]}")
+    
+    positions = NUM_TO_POS[nums]
+    rows = positions[..., 0]
+    cols = positions[..., 1]
+    k = nums.shape[1]
+    
+    # Distâncias entre todos os pares de posições do sorteio
+    d_row = np.abs(rows[:, :, None] - rows[:, None, :])
+    d_col = np.abs(cols[:, :, None] - cols[:, None, :])
+    adjacent_4 = (d_row + d_col) == 1
+    adjacent_8 = np.maximum(d_row, d_col) == 1
+    
+    # Geometria (mesmas operações de compute_inertia/eccentricity/compactness)
+    mean_row = rows.mean(axis=1, keepdims=True)
+    mean_col = cols.mean(axis=1, keepdims=True)
+    deviations = (rows - mean_row) ** 2 + (cols - mean_col) ** 2
+    inertia = np.zeros(len(nums))
+    for j in range(k):
+        inertia = inertia + deviations[:, j]
+    
+    std_row = rows.std(axis=1)
+    std_col = cols.std(axis=1)
+    degenerate = (std_row == 0) | (std_col == 0)
+    eccentricity = np.where(degenerate, 1.0, std_row / np.where(degenerate, 1.0, std_col))
+    
+    height = rows.max(axis=1) - rows.min(axis=1) + 1
+    width = cols.max(axis=1) - cols.min(axis=1) + 1
+    compactness = k / (2 * (height + width))
+    
+    # Simetria e anéis por tabela
+    upper = NUM_IN_UPPER[nums].sum(axis=1)
+    left = NUM_IN_LEFT[nums].sum(axis=1)
+    ring = NUM_TO_RING[nums]
+    ring1 = (ring == 1).sum(axis=1)
+    ring2 = (ring == 2).sum(axis=1)
+    
+    columns = {
+        "adjacencies_4": adjacent_4.sum(axis=(1, 2)) // 2,
+        "adjacencies_8": adjacent_8.sum(axis=(1, 2)) // 2,
+        "connectivity_4": _count_components(adjacent_4),
+        "connectivity_8": _count_components(adjacent_8),
+        "inertia": inertia,
+        "eccentricity": eccentricity,
+        "compactness": compactness,
+        "symmetry_horizontal": np.abs(2 * upper - k),
+        "symmetry_vertical": np.abs(2 * left - k),
+        "ring1": ring1,
+        "ring2": ring2,
+        "ring3": k - ring1 - ring2,
+    }
+    return {name: columns[name].astype(dtype, copy=False) for name, dtype in ADVANCED_FEATURE_DTYPES.items()}
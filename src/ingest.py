@@ -4,15 +4,26 @@ Módulo para ingestão de dados da Mega-Sena.
 Lê o arquivo Excel com histórico de sorteios e converte para formato estruturado.
 """
 
+import json
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Versão do formato do cache de ingestão: incremente ao mudar a limpeza em
+# _read_draws_excel para invalidar os caches já gravados
+INGEST_CACHE_VERSION = 1
+
+# Chave dos metadados do Parquet que identificam a planilha de origem
+_CACHE_METADATA_KEY = b"megasena.ingest_source"
 
 
 def ingest_raw_data(
     input_path: str = "data/raw/Mega-Sena.xlsx",
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    cache_dir: Optional[str] = None
 ) -> pd.DataFrame:
     """
     Lê o arquivo Excel da Mega-Sena e retorna um DataFrame limpo.
@@ -22,9 +33,16 @@ def ingest_raw_data(
     - Data do Sorteio: data do sorteio
     - Bola1, Bola2, Bola3, Bola4, Bola5, Bola6: números sorteados
     
+    Com cache_dir, o resultado limpo é guardado em um Parquet nesse
+    diretório, junto com o caminho, o tamanho e o mtime da planilha e
+    INGEST_CACHE_VERSION. As chamadas seguintes leem o Parquet, sem abrir a
+    planilha, só se todos esses valores forem iguais; qualquer diferença
+    refaz a leitura do Excel. Sem cache_dir (padrão) nada é gravado.
+    
     Args:
         input_path: Caminho para o arquivo Excel
         output_path: Caminho opcional para salvar CSV limpo
+        cache_dir: Diretório opcional do cache em Parquet (None = sem cache)
         
     Returns:
         DataFrame com os dados limpos
@@ -41,19 +59,128 @@ def ingest_raw_data(
             f"Certifique-se de colocar o arquivo Mega-Sena.xlsx em data/raw/"
         )
     
-    # Lê o arquivo Excel
-    df = pd.read_excel(input_file)
+    if cache_dir is None:
+        df = _read_draws_excel(input_file)
+    else:
+        cache_file = Path(cache_dir) / f"{input_file.stem}.ingest_cache.parquet"
+        source = _cache_source_metadata(input_file)
+        
+        df = _read_cache(cache_file, source)
+        if df is None:
+            df = _read_draws_excel(input_file)
+            _write_cache(cache_file, df, source)
     
-    # Valida colunas esperadas
+    # Salva CSV se solicitado
+    if output_path:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(output_file, index=False)
+        print(f"Dados salvos em: {output_file}")
+    
+    print(f"✓ Dados carregados: {len(df)} concursos")
+    print(f"✓ Período: {df['data'].min()} a {df['data'].max()}")
+    
+    return df
+
+
+def _cache_source_metadata(input_file: Path) -> bytes:
+    """
+    Identificação da planilha gravada nos metadados do cache.
+    
+    Args:
+        input_file: Caminho para o arquivo Excel
+    
+    Returns:
+        JSON com versão do formato, caminho, tamanho e mtime (ns) do arquivo
+    """
+    stat = input_file.stat()
+    return json.dumps({
+        "version": INGEST_CACHE_VERSION,
+        "path": str(input_file.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }, sort_keys=True).encode()
+
+
+def _read_cache(cache_file: Path, source: bytes) -> Optional[pd.DataFrame]:
+    """
+    Lê o cache de ingestão se ele corresponder exatamente à planilha.
+    
+    Args:
+        cache_file: Caminho do Parquet de cache
+        source: Identificação atual da planilha (_cache_source_metadata)
+    
+    Returns:
+        DataFrame do cache, ou None se não existir ou estiver desatualizado
+    """
+    if not cache_file.exists():
+        return None
+    
+    try:
+        metadata = pq.read_schema(cache_file).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    
+    if metadata.get(_CACHE_METADATA_KEY) != source:
+        return None
+    
+    return pd.read_parquet(cache_file)
+
+
+def _write_cache(cache_file: Path, df: pd.DataFrame, source: bytes):
+    """
+    Grava o cache de ingestão com a identificação da planilha nos metadados.
+    
+    Args:
+        cache_file: Caminho do Parquet de cache
+        df: DataFrame limpo
+        source: Identificação da planilha (_cache_source_metadata)
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _CACHE_METADATA_KEY: source,
+    })
+    
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, cache_file)
+
+
+def _read_draws_excel(input_file: Path) -> pd.DataFrame:
+    """
+    Lê e limpa os sorteios da planilha da Mega-Sena.
+    
+    Só as 8 colunas usadas são convertidas pelo openpyxl; os nomes das
+    demais são registrados apenas para a mensagem de erro.
+    
+    Args:
+        input_file: Caminho para o arquivo Excel
+    
+    Returns:
+        DataFrame com concurso, data e bola_1..bola_6, ordenado por concurso
+    
+    Raises:
+        ValueError: Se o formato do arquivo estiver incorreto
+    """
     required_cols = ["Concurso", "Data do Sorteio"]
     ball_cols = [f"Bola{i}" for i in range(1, 7)]
     expected_cols = required_cols + ball_cols
     
+    # Lê o arquivo Excel (apenas as colunas esperadas)
+    found_cols = []
+    
+    def wanted(col) -> bool:
+        found_cols.append(col)
+        return col in expected_cols
+    
+    df = pd.read_excel(input_file, engine="openpyxl", usecols=wanted)
+    
+    # Valida colunas esperadas
     missing_cols = set(expected_cols) - set(df.columns)
     if missing_cols:
         raise ValueError(
             f"Colunas ausentes no arquivo: {missing_cols}\n"
-            f"Colunas encontradas: {list(df.columns)}"
+            f"Colunas encontradas: {found_cols}"
         )
     
     # Seleciona e renomeia colunas
@@ -84,25 +211,40 @@ def ingest_raw_data(
                 f"{invalid[['concurso', col]]}"
             )
     
-    # Salva CSV se solicitado
-    if output_path:
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_file, index=False)
-        print(f"Dados salvos em: {output_file}")
+    return df
+
+
+def build_draw_index(df: pd.DataFrame) -> np.ndarray:
+    """
+    Monta uma tabela de consulta dos números por concurso.
     
-    print(f"✓ Dados carregados: {len(df)} concursos")
-    print(f"✓ Período: {df['data'].min()} a {df['data'].max()}")
+    A linha ``concurso`` da tabela guarda as 6 bolas daquele concurso;
+    concursos ausentes ficam preenchidos com -1.
     
-    return df
+    Args:
+        df: DataFrame com os dados
+    
+    Returns:
+        Array (max_concurso + 1, 6) indexado pelo número do concurso
+    """
+    ball_columns = [f"bola_{i}" for i in range(1, 7)]
+    concursos = df["concurso"].to_numpy(dtype=np.int64)
+    
+    index = np.full((concursos.max() + 1 if len(concursos) else 0, 6), -1, dtype=np.int64)
+    index[concursos] = df[ball_columns].to_numpy(dtype=np.int64)
+    
+    return index
 
 
-def get_draw_numbers(df: pd.DataFrame, concurso: int) -> list:
+def get_draw_numbers(df: Union[pd.DataFrame, np.ndarray], concurso: int) -> list:
     """
     Retorna os números sorteados em um concurso específico.
     
+    Para consultas repetidas, passe a tabela de ``build_draw_index`` no lugar
+    do DataFrame: a busca vira um acesso direto em vez de varrer o DataFrame.
+    
     Args:
-        df: DataFrame com os dados
+        df: DataFrame com os dados ou tabela de build_draw_index
         concurso: Número do concurso
         
     Returns:
@@ -111,17 +253,18 @@ def get_draw_numbers(df: pd.DataFrame, concurso: int) -> list:
     Raises:
         ValueError: Se o concurso não existir
     """
-    row = df[df["concurso"] == concurso]
+    if isinstance(df, pd.DataFrame):
+        matches = np.flatnonzero(df["concurso"].to_numpy() == concurso)
+        if len(matches) == 0:
+            raise ValueError(f"Concurso {concurso} não encontrado")
+        
+        ball_columns = [f"bola_{i}" for i in range(1, 7)]
+        return df[ball_columns].iloc[matches[0]].tolist()
     
-    if len(row) == 0:
+    if not 0 <= concurso < len(df) or df[concurso, 0] < 0:
         raise ValueError(f"Concurso {concurso} não encontrado")
     
-    numbers = [
-        row[f"bola_{i}"].iloc[0]
-        for i in range(1, 7)
-    ]
-    
-    return numbers
+    return df[concurso].tolist()
 
 
 def validate_data_integrity(df: pd.DataFrame) -> bool:
@@ -153,13 +296,15 @@ def validate_data_integrity(df: pd.DataFrame) -> bool:
         if not df[col].between(1, 60).all():
             raise ValueError(f"Coluna {col} contém números fora do intervalo 1-60")
     
-    # Verifica duplicatas em concursos
-    for idx, row in df.iterrows():
-        numbers = [row[f"bola_{i}"] for i in range(1, 7)]
-        if len(numbers) != len(set(numbers)):
-            raise ValueError(
-                f"Concurso {row['concurso']} tem números duplicados: {numbers}"
-            )
+    # Verifica duplicatas em concursos (números iguais ficam vizinhos após ordenar)
+    balls = df[ball_columns].to_numpy()
+    has_dup = (np.diff(np.sort(balls, axis=1), axis=1) == 0).any(axis=1)
+    if has_dup.any():
+        first = np.flatnonzero(has_dup)[0]
+        raise ValueError(
+            f"Concurso {df['concurso'].iloc[first]} tem números duplicados: "
+            f"{balls[first].tolist()}"
+        )
     
     # Verifica ordem dos concursos
     if not df["concurso"].is_monotonic_increasing:
@@ -4,30 +4,54 @@ Módulo para simulação Monte Carlo de sorteios aleatórios.
 Gera baseline nulo para comparação estatística com dados observados.
 """
 
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import os
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 from tqdm import tqdm
 
-from .features import extract_features_for_draw
-from .features_advanced import extract_advanced_features
+from .features import PARQUET_ZSTD_LEVEL, extract_features_batch
+from .features_advanced import extract_advanced_features_batch
+
+# Tipo das features inteiras na simulação (contagens e posições cabem em 16 bits)
+SIMULATION_INT_DTYPE = np.int16
+
+# Sorteios por bloco gravado em stream_monte_carlo_to_parquet
+STREAM_CHUNK_ROWS = 500_000
+
+# Opções de escrita do Parquet da simulação (dicionário + ZSTD)
+SIMULATION_PARQUET_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": PARQUET_ZSTD_LEVEL,
+    "use_dictionary": True,
+}
 
 
 def generate_random_draw(seed: int = None) -> List[int]:
     """
     Gera um sorteio aleatório de 6 números únicos entre 1 e 60.
     
+    Usa o algoritmo de Floyd: 6 inteiros sorteados numa única chamada ao
+    gerador, sem permutar os 60 números nem alterar o estado global do NumPy.
+    
     Args:
         seed: Seed para reprodutibilidade
         
     Returns:
         Lista com 6 números únicos sorteados aleatoriamente
     """
-    if seed is not None:
-        np.random.seed(seed)
+    highs = range(55, 61)
+    picks = np.random.default_rng(seed).integers(1, np.array(highs) + 1)
+    
+    draw = set()
+    for high, pick in zip(highs, picks.tolist()):
+        draw.add(high if pick in draw else pick)
     
-    return sorted(np.random.choice(range(1, 61), size=6, replace=False).tolist())
+    return sorted(draw)
 
 
 def generate_random_draws(n_draws: int, seed: int = None) -> List[List[int]]:
@@ -41,29 +65,125 @@ def generate_random_draws(n_draws: int, seed: int = None) -> List[List[int]]:
     Returns:
         Lista de sorteios, cada um com 6 números
     """
-    if seed is not None:
-        np.random.seed(seed)
+    return sample_draws(n_draws, np.random.default_rng(seed)).tolist()
+
+
+def sample_draws(n_draws: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Sorteia n_draws combinações de 6 números entre 1 e 60 de uma vez.
     
-    draws = []
-    for i in range(n_draws):
-        draw = sorted(np.random.choice(range(1, 61), size=6, replace=False).tolist())
-        draws.append(draw)
+    Cada linha recebe 60 chaves uniformes; os índices das 6 menores formam
+    uma amostra sem reposição uniforme. Uma chamada ao gerador e um
+    argpartition substituem um choice por sorteio.
     
+    Args:
+        n_draws: Número de sorteios
+        rng: Gerador NumPy
+    
+    Returns:
+        Array (n_draws, 6) com cada sorteio em ordem crescente
+    """
+    keys = rng.random((n_draws, 60))
+    draws = np.argpartition(keys, 5, axis=1)[:, :6] + 1
+    draws.sort(axis=1)
     return draws
 
 
+def _featurize_draws(draws: np.ndarray, include_advanced: bool) -> Dict[str, np.ndarray]:
+    """
+    Features de um bloco de sorteios, coluna a coluna.
+    
+    Args:
+        draws: Array (n_sorteios, 6)
+        include_advanced: Se True, inclui features avançadas
+    
+    Returns:
+        Dicionário feature -> array (n_sorteios,), básicas antes das avançadas
+    """
+    features = extract_features_batch(draws)
+    if include_advanced:
+        features.update(extract_advanced_features_batch(draws))
+    return features
+
+
+def _simulate_chunk(
+    sim_ids: range,
+    n_draws_per_sim: int,
+    seed: int,
+    include_advanced: bool,
+    n_jobs: int,
+    progress: tqdm
+) -> pd.DataFrame:
+    """
+    Executa as simulações de sim_ids e devolve suas features.
+    
+    Os valores vão direto para colunas pré-alocadas (inteiros em
+    SIMULATION_INT_DTYPE). Cada simulação usa a seed seed + sim_id e escreve
+    na sua própria faixa das colunas, então o resultado não depende de n_jobs
+    nem de como as simulações são divididas em blocos.
+    
+    Args:
+        sim_ids: Intervalo de ids de simulação
+        n_draws_per_sim: Número de sorteios por simulação
+        seed: Seed base
+        include_advanced: Se True, inclui features avançadas
+        n_jobs: Workers para as simulações (1 = em série, -1 = todos os núcleos)
+        progress: Barra de progresso, avançada a cada simulação
+    
+    Returns:
+        DataFrame com as features e as colunas simulation_id e draw_id
+    """
+    template = _featurize_draws(np.arange(1, 7).reshape(1, 6), include_advanced)
+    columns = {
+        name: np.empty(
+            len(sim_ids) * n_draws_per_sim,
+            dtype=SIMULATION_INT_DTYPE if np.issubdtype(values.dtype, np.integer) else values.dtype
+        )
+        for name, values in template.items()
+    }
+    
+    def run_simulation(sim_id: int) -> None:
+        # Gera os sorteios desta simulação e já extrai as features
+        draws = sample_draws(n_draws_per_sim, np.random.default_rng(seed + sim_id))
+        start = (sim_id - sim_ids.start) * n_draws_per_sim
+        for name, values in _featurize_draws(draws, include_advanced).items():
+            columns[name][start:start + n_draws_per_sim] = values
+    
+    workers = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        mapper = pool.map if workers > 1 else map
+        for _ in mapper(run_simulation, sim_ids):
+            progress.update()
+    
+    df = pd.DataFrame(columns, copy=False)
+    
+    # Adiciona metadados
+    df["simulation_id"] = np.repeat(np.arange(sim_ids.start, sim_ids.stop), n_draws_per_sim)
+    df["draw_id"] = np.tile(np.arange(n_draws_per_sim), len(sim_ids))
+    
+    return df
+
+
 def simulate_monte_carlo(
     n_simulations: int = 10000,
     n_draws_per_sim: int = 100,
     seed: int = 42,
     include_advanced: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    n_jobs: int = 1
 ) -> pd.DataFrame:
     """
     Executa simulação Monte Carlo completa.
     
     Gera n_simulations conjuntos de sorteios aleatórios, cada um com
-    n_draws_per_sim sorteios. Calcula features para cada sorteio.
+    n_draws_per_sim sorteios. Cada simulação é gerada e transformada em
+    features logo em seguida (básicas e avançadas em lote), e os
+    valores vão direto para colunas pré-alocadas: os sorteios de todas as
+    simulações nunca ficam em memória ao mesmo tempo.
+    
+    Com n_jobs > 1 as simulações são distribuídas entre threads (as operações
+    NumPy liberam o GIL); o resultado não depende de n_jobs. Para simulações
+    grandes demais para a memória, use stream_monte_carlo_to_parquet.
     
     Args:
         n_simulations: Número de simulações independentes
@@ -71,40 +191,15 @@ def simulate_monte_carlo(
         seed: Seed para reprodutibilidade
         include_advanced: Se True, inclui features avançadas
         verbose: Se True, exibe progresso
-        
+        n_jobs: Workers para as simulações (1 = em série, -1 = todos os núcleos)
+    
     Returns:
         DataFrame com todas as features de todos os sorteios simulados
     """
-    np.random.seed(seed)
-    
-    all_features = []
-    
-    iterator = range(n_simulations)
-    if verbose:
-        iterator = tqdm(iterator, desc="Monte Carlo")
-    
-    for sim_id in iterator:
-        # Gera sorteios para esta simulação
-        draws = generate_random_draws(n_draws_per_sim, seed=seed + sim_id)
-        
-        # Calcula features para cada sorteio
-        for draw_id, numbers in enumerate(draws):
-            # Features básicas
-            features = extract_features_for_draw(numbers)
-            
-            # Features avançadas
-            if include_advanced:
-                advanced = extract_advanced_features(numbers)
-                features.update(advanced)
-            
-            # Adiciona metadados
-            features["simulation_id"] = sim_id
-            features["draw_id"] = draw_id
-            
-            all_features.append(features)
-    
-    # Converte para DataFrame
-    df = pd.DataFrame(all_features)
+    with tqdm(total=n_simulations, desc="Monte Carlo", disable=not verbose) as progress:
+        df = _simulate_chunk(
+            range(n_simulations), n_draws_per_sim, seed, include_advanced, n_jobs, progress
+        )
     
     if verbose:
         print(f"\n✓ Simulação concluída:")
@@ -116,22 +211,93 @@ def simulate_monte_carlo(
     return df
 
 
-def compute_baseline_statistics(
-    simulation_df: pd.DataFrame
+def stream_monte_carlo_to_parquet(
+    output_file: str = "data/processed/monte_carlo_simulation.parquet",
+    n_simulations: int = 10000,
+    n_draws_per_sim: int = 100,
+    seed: int = 42,
+    include_advanced: bool = True,
+    verbose: bool = True,
+    n_jobs: int = 1,
+    chunk_rows: int = STREAM_CHUNK_ROWS
 ) -> pd.DataFrame:
     """
-    Calcula estatísticas do baseline Monte Carlo.
+    Executa a simulação Monte Carlo gravando o Parquet bloco a bloco.
     
-    Para cada feature, calcula:
-    - Média das médias por simulação
-    - Desvio padrão das médias
-    - Percentis 2.5%, 50%, 97.5%
+    As simulações são processadas em blocos de até chunk_rows sorteios; cada
+    bloco vira um row group do arquivo e é descartado em seguida, então a
+    memória não cresce com n_simulations. O arquivo e as estatísticas são
+    os mesmos de simulate_monte_carlo + compute_baseline_statistics +
+    save_simulation_results.
     
     Args:
-        simulation_df: DataFrame com resultados da simulação
-        
+        output_file: Caminho do Parquet da simulação
+        n_simulations: Número de simulações independentes
+        n_draws_per_sim: Número de sorteios por simulação
+        seed: Seed para reprodutibilidade
+        include_advanced: Se True, inclui features avançadas
+        verbose: Se True, exibe progresso
+        n_jobs: Workers para as simulações (1 = em série, -1 = todos os núcleos)
+        chunk_rows: Sorteios por bloco gravado
+    
     Returns:
         DataFrame com estatísticas do baseline
+    
+    Raises:
+        ValueError: Se n_simulations ou n_draws_per_sim não forem positivos
+    """
+    if n_simulations < 1:
+        raise ValueError(f"n_simulations deve ser positivo, recebido: {n_simulations}")
+    if n_draws_per_sim < 1:
+        raise ValueError(f"n_draws_per_sim deve ser positivo, recebido: {n_draws_per_sim}")
+    
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    sims_per_chunk = max(1, chunk_rows // n_draws_per_sim)
+    sim_means = []
+    writer = None
+    dtypes = None
+    
+    with tqdm(total=n_simulations, desc="Monte Carlo", disable=not verbose) as progress:
+        try:
+            for start in range(0, n_simulations, sims_per_chunk):
+                sim_ids = range(start, min(start + sims_per_chunk, n_simulations))
+                chunk = _simulate_chunk(
+                    sim_ids, n_draws_per_sim, seed, include_advanced, n_jobs, progress
+                )
+                sim_means.append(_simulation_means(chunk))
+                
+                # Tipos fixados no primeiro bloco; simulation_id pelo maior id
+                if dtypes is None:
+                    dtypes = _downcast_integers(chunk).dtypes.to_dict()
+                    dtypes["simulation_id"] = pd.to_numeric(
+                        pd.Series([n_simulations - 1]), downcast="integer"
+                    ).dtype
+                
+                table = pa.Table.from_pandas(chunk.astype(dtypes), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema, **SIMULATION_PARQUET_OPTIONS)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    if verbose:
+        print(f"\n✓ Simulação salva: {output_path}")
+    
+    return _summarize_simulation_means(pd.concat(sim_means))
+
+
+def _simulation_means(simulation_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Média de cada feature por simulação (ignora NaN).
+    
+    Args:
+        simulation_df: DataFrame com resultados da simulação
+    
+    Returns:
+        DataFrame indexado por simulation_id
     """
     # Remove colunas de metadados
     feature_cols = [
@@ -139,9 +305,19 @@ def compute_baseline_statistics(
         if col not in ["simulation_id", "draw_id"]
     ]
     
-    # Agrupa por simulação e calcula média (ignora NaN)
-    sim_means = simulation_df.groupby("simulation_id")[feature_cols].mean()
+    return simulation_df.groupby("simulation_id")[feature_cols].mean()
+
+
+def _summarize_simulation_means(sim_means: pd.DataFrame) -> pd.DataFrame:
+    """
+    Estatísticas do baseline a partir das médias por simulação.
+    
+    Args:
+        sim_means: DataFrame com a média de cada feature por simulação
     
+    Returns:
+        DataFrame com estatísticas do baseline
+    """
     # Estatísticas do baseline (skipna=True para ignorar NaN)
     stats = pd.DataFrame({
         "mean": sim_means.mean(skipna=True),
@@ -159,6 +335,43 @@ def compute_baseline_statistics(
     return stats
 
 
+def compute_baseline_statistics(
+    simulation_df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Calcula estatísticas do baseline Monte Carlo.
+    
+    Para cada feature, calcula:
+    - Média das médias por simulação
+    - Desvio padrão das médias
+    - Percentis 2.5%, 50%, 97.5%
+    
+    Args:
+        simulation_df: DataFrame com resultados da simulação
+    
+    Returns:
+        DataFrame com estatísticas do baseline
+    """
+    return _summarize_simulation_means(_simulation_means(simulation_df))
+
+
+def _downcast_integers(simulation_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas inteiras para o menor tipo que as comporta.
+    
+    Args:
+        simulation_df: DataFrame com resultados da simulação
+    
+    Returns:
+        DataFrame com int8 para contagens e int16 para ids
+    """
+    int_columns = simulation_df.select_dtypes("integer").columns
+    return simulation_df.assign(**{
+        col: pd.to_numeric(simulation_df[col], downcast="integer")
+        for col in int_columns
+    })
+
+
 def save_simulation_results(
     simulation_df: pd.DataFrame,
     baseline_stats: pd.DataFrame,
@@ -175,12 +388,34 @@ def save_simulation_results(
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Salva simulação completa (comprimido)
+    # Salva simulação completa (comprimido): inteiros no menor tipo que os
+    # comporta e dicionário + ZSTD
     sim_file = output_path / "monte_carlo_simulation.parquet"
-    simulation_df.to_parquet(sim_file, index=False)
+    _downcast_integers(simulation_df).to_parquet(
+        sim_file,
+        engine="pyarrow",
+        index=False,
+        **SIMULATION_PARQUET_OPTIONS
+    )
     print(f"✓ Simulação salva: {sim_file}")
     
-    # Salva estatísticas do baseline
+    save_baseline_statistics(baseline_stats, output_dir)
+
+
+def save_baseline_statistics(
+    baseline_stats: pd.DataFrame,
+    output_dir: str = "data/processed"
+):
+    """
+    Salva estatísticas do baseline.
+    
+    Args:
+        baseline_stats: DataFrame com estatísticas do baseline
+        output_dir: Diretório para salvar o arquivo
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    
     stats_file = output_path / "baseline_statistics.parquet"
     baseline_stats.to_parquet(stats_file)
     print(f"✓ Estatísticas salvas: {stats_file}")
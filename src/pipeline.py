@@ -21,11 +21,13 @@ from .features import (
     build_vectors_dataset,
     save_features
 )
-from .features_advanced import extract_advanced_features
+from .features_advanced import extract_advanced_features_batch
 from .monte_carlo import (
     simulate_monte_carlo,
+    stream_monte_carlo_to_parquet,
     compute_baseline_statistics,
     save_simulation_results,
+    save_baseline_statistics,
     load_baseline_statistics,
     compare_with_baseline
 )
@@ -37,6 +39,9 @@ from .validation import (
 )
 from .visualization import generate_all_visualizations
 
+# Cache da planilha limpa (ingest_raw_data), junto às demais saídas do pipeline
+INGEST_CACHE_DIR = "data/processed"
+
 
 app = typer.Typer(
     help="Pipeline de análise espacial da Mega-Sena",
@@ -71,7 +76,7 @@ def ingest(
     
     try:
         # Carrega dados
-        df = ingest_raw_data(input_path)
+        df = ingest_raw_data(input_path, cache_dir=INGEST_CACHE_DIR)
         
         # Valida se solicitado
         if validate:
@@ -128,7 +133,7 @@ def build_features(
     try:
         # Carrega dados
         typer.echo(f"\nCarregando dados de: {input_path}")
-        df = ingest_raw_data(input_path)
+        df = ingest_raw_data(input_path, cache_dir=INGEST_CACHE_DIR)
         
         # Constrói features
         typer.echo("\nExtraindo features espaciais...")
@@ -187,6 +192,11 @@ def simulate(
         "data/raw/Mega-Sena.xlsx",
         "--input", "-i",
         help="Caminho para arquivo Excel (para determinar n_draws)"
+    ),
+    n_jobs: int = typer.Option(
+        1,
+        "--n-jobs", "-j",
+        help="Workers para as simulações (-1 = todos os núcleos)"
     )
 ):
     """
@@ -202,26 +212,24 @@ def simulate(
     try:
         # Determina n_draws se não fornecido
         if n_draws is None:
-            df = ingest_raw_data(input_path)
+            df = ingest_raw_data(input_path, cache_dir=INGEST_CACHE_DIR)
             n_draws = len(df)
             typer.echo(f"\nNúmero de sorteios por simulação: {n_draws} (igual ao observado)")
         
-        # Executa simulação
+        # Executa simulação gravando em blocos (memória não cresce com n_simulations)
         typer.echo(f"\nExecutando {n_simulations} simulações...")
-        simulation_df = simulate_monte_carlo(
+        baseline_stats = stream_monte_carlo_to_parquet(
+            "data/processed/monte_carlo_simulation.parquet",
             n_simulations=n_simulations,
             n_draws_per_sim=n_draws,
             seed=seed,
             include_advanced=True,
-            verbose=True
+            verbose=True,
+            n_jobs=n_jobs
         )
         
-        # Calcula estatísticas do baseline
-        typer.echo("\nCalculando estatísticas do baseline...")
-        baseline_stats = compute_baseline_statistics(simulation_df)
-        
-        # Salva resultados
-        save_simulation_results(simulation_df, baseline_stats)
+        # Salva estatísticas do baseline
+        save_baseline_statistics(baseline_stats)
         
         typer.secho("\n✓ Simulação concluída com sucesso!", fg=typer.colors.GREEN, bold=True)
         
@@ -339,7 +347,7 @@ def visualize(
     try:
         # Carrega dados
         typer.echo("\nCarregando dados...")
-        raw_df = ingest_raw_data(input_path)
+        raw_df = ingest_raw_data(input_path, cache_dir=INGEST_CACHE_DIR)
         observed_df = pd.read_parquet(features_path)
         simulation_df = pd.read_parquet(simulation_path)
         validation_df = pd.read_parquet(validation_path)
@@ -385,7 +393,7 @@ def run_all(
     try:
         # 1. Ingestão
         typer.echo("\n[1/5] Ingestão de dados...")
-        df = ingest_raw_data(input_path)
+        df = ingest_raw_data(input_path, cache_dir=INGEST_CACHE_DIR)
         validate_data_integrity(df)
         
         # 2. Features (básicas + avançadas)
@@ -394,14 +402,11 @@ def run_all(
         
         # Adiciona features avançadas
         typer.echo("Extraindo features avançadas...")
-        advanced_list = []
-        for _, row in df.iterrows():
-            numbers = [row[f"bola_{i}"] for i in range(1, 7)]
-            advanced = extract_advanced_features(numbers)
-            advanced["concurso"] = row["concurso"]
-            advanced_list.append(advanced)
-        
-        advanced_df = pd.DataFrame(advanced_list)
+        ball_columns = [f"bola_{i}" for i in range(1, 7)]
+        advanced_df = pd.DataFrame({
+            "concurso": df["concurso"].to_numpy(),
+            **extract_advanced_features_batch(df[ball_columns].to_numpy()),
+        })
         features_df = features_df.merge(advanced_df, on="concurso")
         
         vectors = build_vectors_dataset(df)
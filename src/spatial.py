@@ -19,6 +19,22 @@ from typing import Tuple, List
 import numpy as np
 
 
+# Tabela número -> (row, col), indexada pelo próprio número (linha 0 não usada).
+# NUM_TO_POS[nums] converte um array (n, 6) em (n, 6, 2) com uma só leitura.
+NUM_TO_POS = np.full((61, 2), -1, dtype=np.int64)
+NUM_TO_POS[1:, 0] = np.arange(60) % 10
+NUM_TO_POS[1:, 1] = np.arange(60) // 10
+
+_POSITIONS = tuple((int(row), int(col)) for row, col in NUM_TO_POS)
+
+# Quadrante de cada número (mesma numeração de get_quadrant; -1 na linha 0)
+NUM_TO_QUADRANT = np.full(61, -1, dtype=np.int8)
+NUM_TO_QUADRANT[1:] = (NUM_TO_POS[1:, 0] >= 5) * 2 + (NUM_TO_POS[1:, 1] >= 3)
+
+# Bits ligados por valor de byte (popcount sem np.bitwise_count, NumPy < 2.0)
+_POPCOUNT_BYTE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
 def num_to_pos(num: int) -> Tuple[int, int]:
     """
     Converte um número da Mega-Sena (1-60) para posição (row, col) no volante.
@@ -47,14 +63,8 @@ def num_to_pos(num: int) -> Tuple[int, int]:
     if not 1 <= num <= 60:
         raise ValueError(f"Número deve estar entre 1 e 60, recebido: {num}")
     
-    # Ajusta para índice 0-based
-    num_idx = num - 1
-    
-    # Calcula coluna e linha
-    col = num_idx // 10
-    row = num_idx % 10
-    
-    return (row, col)
+    # Coluna = (num - 1) // 10, linha = (num - 1) % 10, pré-calculadas
+    return _POSITIONS[num]
 
 
 def pos_to_num(row: int, col: int) -> int:
@@ -127,6 +137,67 @@ def nums_to_binary_vector(nums: List[int]) -> np.ndarray:
     return vector
 
 
+def nums_to_bitmap(nums: np.ndarray) -> np.ndarray:
+    """
+    Converte sorteios em bitmaps uint64 (bit num - 1 ligado se o número saiu).
+    
+    Equivale a nums_to_binary_vector compactado: 8 bytes por sorteio em vez
+    de 60.
+    
+    Args:
+        nums: Array (n_sorteios, k) com números entre 1 e 60
+    
+    Returns:
+        Array uint64 (n_sorteios,)
+    
+    Examples:
+        >>> int(nums_to_bitmap(np.array([[1, 2, 60]]))[0]) == (1 | 2 | 1 << 59)
+        True
+    """
+    nums = np.asarray(nums, dtype=np.int64)
+    
+    invalid = (nums < 1) | (nums > 60)
+    if invalid.any():
+        raise ValueError(f"Número deve estar entre 1 e 60, recebido: {nums[invalid][0]}")
+    
+    bits = np.left_shift(np.uint64(1), (nums - 1).astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def bitmaps_to_vectors(bitmaps: np.ndarray) -> np.ndarray:
+    """
+    Expande bitmaps de nums_to_bitmap para vetores binários de 60 posições.
+    
+    Args:
+        bitmaps: Array uint64 (n_sorteios,)
+    
+    Returns:
+        Array int8 (n_sorteios, 60), como nums_to_binary_vector por linha
+    """
+    bitmaps = np.asarray(bitmaps, dtype=np.uint64)
+    shifts = np.arange(60, dtype=np.uint64)
+    return ((bitmaps[:, None] >> shifts) & np.uint64(1)).astype(np.int8)
+
+
+def count_common_numbers(bitmaps_a: np.ndarray, bitmaps_b: np.ndarray) -> np.ndarray:
+    """
+    Conta os números em comum entre sorteios (popcount de a & b).
+    
+    Args:
+        bitmaps_a: Bitmaps uint64 de nums_to_bitmap
+        bitmaps_b: Bitmaps uint64, com shape compatível por broadcasting
+    
+    Returns:
+        Array com a quantidade de números em comum
+    """
+    common = np.bitwise_and(np.asarray(bitmaps_a, dtype=np.uint64), np.asarray(bitmaps_b, dtype=np.uint64))
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(common)
+    
+    as_bytes = np.ascontiguousarray(common).view(np.uint8).reshape(common.shape + (8,))
+    return _POPCOUNT_BYTE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
 def get_quadrant(row: int, col: int) -> int:
     """
     Determina o quadrante de uma posição no volante.
@@ -11,7 +11,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
-from .spatial import num_to_pos
+from .spatial import NUM_TO_POS
 
 
 def plot_heatmap_density(
@@ -32,12 +32,10 @@ def plot_heatmap_density(
     # Matriz 10x6 para frequências
     freq_matrix = np.zeros((10, 6))
     
-    # Conta frequências
-    for _, row in df.iterrows():
-        for i in range(1, 7):
-            num = row[f"bola_{i}"]
-            r, c = num_to_pos(num)
-            freq_matrix[r, c] += 1
+    # Conta frequências (todas as bolas de uma vez via tabela de posições)
+    nums = df[[f"bola_{i}" for i in range(1, 7)]].to_numpy(dtype=np.int64)
+    positions = NUM_TO_POS[nums]
+    np.add.at(freq_matrix, (positions[..., 0], positions[..., 1]), 1)
     
     # Normaliza (frequência relativa)
     freq_matrix /= len(df)
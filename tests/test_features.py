@@ -4,6 +4,7 @@ Testes unitários para o módulo features.
 
 import pytest
 import numpy as np
+import pandas as pd
 from src.features import (
     compute_centroid,
     compute_dispersion,
@@ -11,7 +12,10 @@ from src.features import (
     compute_border_count,
     compute_corner_count,
     compute_row_col_distribution,
-    extract_features_for_draw
+    extract_features_for_draw,
+    extract_features_batch,
+    extract_features_parallel,
+    build_features_dataset
 )
 
 
@@ -184,3 +188,48 @@ class TestExtractFeaturesForDraw:
         
         # Todos os cantos são bordas
         assert features["border_count"] >= 4
+
+
+class TestBuildFeaturesDataset:
+    """Testes para construção vetorizada do dataset de features."""
+    
+    @staticmethod
+    def _make_df(draws):
+        """Monta DataFrame no formato de ingest a partir de listas de números."""
+        df = pd.DataFrame({
+            "concurso": np.arange(1, len(draws) + 1),
+            "data": pd.date_range("2020-01-01", periods=len(draws)),
+        })
+        for i in range(6):
+            df[f"bola_{i + 1}"] = [draw[i] for draw in draws]
+        return df
+    
+    def test_matches_extract_features_for_draw(self):
+        """Testa que cada linha é igual à extração por sorteio."""
+        rng = np.random.default_rng(42)
+        draws = [sorted(rng.choice(60, 6, replace=False) + 1) for _ in range(50)]
+        
+        features_df = build_features_dataset(self._make_df(draws))
+        
+        assert list(features_df.columns[:2]) == ["concurso", "data"]
+        for row, numbers in zip(features_df.itertuples(index=False), draws):
+            expected = extract_features_for_draw(numbers)
+            for key, value in expected.items():
+                assert getattr(row, key) == value
+    
+    def test_invalid_number(self):
+        """Testa que números fora de 1-60 são rejeitados."""
+        with pytest.raises(ValueError):
+            build_features_dataset(self._make_df([[0, 10, 20, 30, 40, 50]]))
+    
+    def test_parallel_matches_serial(self):
+        """Testa que a extração em blocos paralelos é igual à serial."""
+        rng = np.random.default_rng(7)
+        nums = np.array([rng.choice(60, 6, replace=False) + 1 for _ in range(100)])
+        
+        serial = extract_features_batch(nums)
+        parallel = extract_features_parallel(nums, n_jobs=3, min_chunk=10)
+        
+        assert list(parallel) == list(serial)
+        for key in serial:
+            np.testing.assert_array_equal(parallel[key], serial[key])
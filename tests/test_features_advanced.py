@@ -0,0 +1,45 @@
+"""
+Testes unitários para o módulo features_advanced.
+"""
+
+import pytest
+import numpy as np
+from src.features_advanced import (
+    extract_advanced_features,
+    extract_advanced_features_batch
+)
+
+
+class TestExtractAdvancedFeaturesBatch:
+    """Testes para extração vetorizada das features avançadas."""
+    
+    def test_matches_extract_advanced_features(self):
+        """Testa que cada sorteio é igual à extração por sorteio."""
+        rng = np.random.default_rng(42)
+        draws = [rng.choice(60, 6, replace=False) + 1 for _ in range(200)]
+        # Casos degenerados: mesma coluna, mesma linha, bloco compacto
+        draws += [[1, 2, 3, 4, 5, 6], [1, 11, 21, 31, 41, 51], [1, 2, 11, 12, 21, 22]]
+        
+        batch = extract_advanced_features_batch(draws)
+        
+        for i, numbers in enumerate(draws):
+            expected = extract_advanced_features(list(numbers))
+            assert list(batch) == list(expected)
+            for key, value in expected.items():
+                assert batch[key][i] == value
+    
+    def test_empty_input(self):
+        """Testa que nenhum sorteio gera colunas vazias com os tipos corretos."""
+        for draws in ([], np.empty((0, 6), dtype=np.int64)):
+            batch = extract_advanced_features_batch(draws)
+            
+            assert list(batch) == list(extract_advanced_features([1, 2, 3, 4, 5, 6]))
+            for column in batch.values():
+                assert column.shape == (0,)
+            assert batch["adjacencies_4"].dtype == np.int64
+            assert batch["inertia"].dtype == np.float64
+    
+    def test_invalid_number(self):
+        """Testa que números fora de 1-60 são rejeitados."""
+        with pytest.raises(ValueError):
+            extract_advanced_features_batch([[0, 10, 20, 30, 40, 50]])
@@ -5,10 +5,15 @@ Testes unitários para o módulo spatial.
 import pytest
 import numpy as np
 from src.spatial import (
+    NUM_TO_POS,
+    NUM_TO_QUADRANT,
     num_to_pos,
     pos_to_num,
     nums_to_positions,
     nums_to_binary_vector,
+    nums_to_bitmap,
+    bitmaps_to_vectors,
+    count_common_numbers,
     get_quadrant,
     is_border,
     is_corner
@@ -102,6 +107,11 @@ class TestRoundTrip:
         for num in range(1, 61):
             pos = num_to_pos(num)
             assert pos_to_num(*pos) == num
+    
+    def test_lookup_table_matches(self):
+        """Testa que a tabela NUM_TO_POS coincide com num_to_pos."""
+        for num in range(1, 61):
+            assert tuple(NUM_TO_POS[num]) == num_to_pos(num)
 
 
 class TestNumsToPositions:
@@ -154,6 +164,31 @@ class TestNumsToBinaryVector:
         assert vec.dtype == np.int8
 
 
+class TestBitmaps:
+    """Testes para vetores binários compactados em uint64."""
+    
+    def test_matches_binary_vector(self):
+        """Testa que o bitmap expandido coincide com nums_to_binary_vector."""
+        draws = np.array([[1, 10, 20, 30, 40, 50], [5, 17, 33, 44, 59, 60]])
+        bitmaps = nums_to_bitmap(draws)
+        assert bitmaps.dtype == np.uint64
+        
+        vectors = bitmaps_to_vectors(bitmaps)
+        for draw, vector in zip(draws, vectors):
+            np.testing.assert_array_equal(vector, nums_to_binary_vector(draw))
+    
+    def test_count_common_numbers(self):
+        """Testa contagem de números em comum entre sorteios."""
+        a = nums_to_bitmap(np.array([[1, 2, 3, 4, 5, 60], [1, 2, 3, 4, 5, 6]]))
+        b = nums_to_bitmap(np.array([[1, 2, 3, 7, 8, 60], [7, 8, 9, 10, 11, 12]]))
+        np.testing.assert_array_equal(count_common_numbers(a, b), [4, 0])
+    
+    def test_invalid_number(self):
+        """Testa número inválido."""
+        with pytest.raises(ValueError):
+            nums_to_bitmap(np.array([[0, 1, 2, 3, 4, 5]]))
+
+
 class TestGetQuadrant:
     """Testes para determinação de quadrante."""
     
@@ -176,6 +211,11 @@ class TestGetQuadrant:
         """Testa quadrante 4 (inferior direito)."""
         assert get_quadrant(5, 3) == 3
         assert get_quadrant(9, 5) == 3
+    
+    def test_lookup_table_matches(self):
+        """Testa que a tabela NUM_TO_QUADRANT coincide com get_quadrant."""
+        for num in range(1, 61):
+            assert NUM_TO_QUADRANT[num] == get_quadrant(*num_to_pos(num))
 
 
 class TestIsBorder: